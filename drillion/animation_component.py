@@ -2,12 +2,10 @@ from drillion.component import Component
 from drillion.maths import Transform2
 
 class AnimationComponent(Component):
-    def __init__(self, transform_component, sprite_component, update_phase,
-                 draw_phase):
+    def __init__(self, transform_component, sprite_component, draw_phase):
         super(AnimationComponent, self).__init__()
         self.transform_component = transform_component
         self.sprite_component = sprite_component
-        self.update_phase = update_phase
         self.draw_phase = draw_phase
         self.old_transform = Transform2()
         self.transform = Transform2()
@@ -16,12 +14,10 @@ class AnimationComponent(Component):
     def create(self):
         self.transform.assign(*self.transform_component.world_transform)
         self.old_transform.assign(*self.transform)
-        self.update_phase.add_handler(self)
         self.draw_phase.add_handler(self)
 
     def delete(self):
         self.draw_phase.remove_handler(self)
-        self.update_phase.remove_handler(self)
 
     def update(self, dt):
         self.old_transform.assign(*self.transform)
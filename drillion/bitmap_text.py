@@ -56,17 +56,23 @@ class BitmapLabel(object):
 
     @text.setter
     def text(self, text):
-        self._text = text
-        self._update_vertex_list()
+        if text != self._text:
+            if len(text) != len(self._text) and self._vertex_list is not None:
+                self._vertex_list.resize(4 * len(text))
+            self._text = text
+            self._update_vertices()
+            self._update_tex_coords()
+            self._update_colors()
 
     @property
     def alignment(self):
         return self._alignment
 
     @alignment.setter
-    def aligment(self, alignment):
-        self._alignment = alignment
-        self._update_vertex_list()
+    def alignment(self, alignment):
+        if tuple(alignment) != tuple(self._alignment):
+            self._alignment = alignment
+            self._update_vertices()
 
     @property
     def transform(self):
@@ -74,8 +80,10 @@ class BitmapLabel(object):
 
     @transform.setter
     def transform(self, transform):
-        self._transform.assign(*transform)
-        self._update_vertex_list()
+        transform = tuple(transform)
+        if transform != tuple(self._transform):
+            self._transform.assign(*transform)
+            self._update_vertices()
 
     @property
     def color(self):
@@ -83,8 +91,16 @@ class BitmapLabel(object):
 
     @color.setter
     def color(self, color):
-        self._color = tuple(color)
-        self._update_vertex_list()
+        color = tuple(color)
+        if color != self._color:
+            # Fully transparent labels are collapsed, so showing or hiding
+            # one also rewrites its vertices and texture coordinates.
+            visibility_changed = (color[3] > 0) != (self._color[3] > 0)
+            self._color = color
+            if visibility_changed:
+                self._update_vertices()
+                self._update_tex_coords()
+            self._update_colors()
 
     @property
     def group(self):
@@ -124,16 +140,25 @@ class BitmapLabel(object):
                                               ('c4B', color_data))
             self._batch = batch
 
-    def _update_vertex_list(self):
+    def _update_vertices(self):
         if self._vertex_list is not None:
-            r, g, b, a = self._color
-            if a > 0:
+            if self._color[3] > 0:
                 self._vertex_list.vertices = tuple(self._generate_vertex_data())
-                self._vertex_list.tex_coords = tuple(self._generate_tex_coord_data())
-                self._vertex_list.colors = 4 * len(self._text) * self._color
             else:
                 self._vertex_list.vertices = 4 * len(self._text) * (0.0, 0.0)
+
+    def _update_tex_coords(self):
+        if self._vertex_list is not None:
+            if self._color[3] > 0:
+                self._vertex_list.tex_coords = tuple(self._generate_tex_coord_data())
+            else:
                 self._vertex_list.tex_coords = 4 * len(self._text) * (0.0, 0.0)
+
+    def _update_colors(self):
+        if self._vertex_list is not None:
+            if self._color[3] > 0:
+                self._vertex_list.colors = 4 * len(self._text) * self._color
+            else:
                 self._vertex_list.colors = 4 * len(self._text) * (0, 0, 0, 0)
 
     def _generate_vertex_data(self):
@@ -2,8 +2,9 @@ from drillion.collision_handler import CollisionHandler
 from drillion.health_component import HealthComponent
 
 class BlockBulletCollisionHandler(CollisionHandler):
-    def __init__(self, entity_manager):
+    def __init__(self, entity_manager, bullet_pool=None):
         self._entity_manager = entity_manager
+        self.bullet_pool = bullet_pool
 
     def on_collision_add(self, collision):
         block_category, block_entity = collision.body_a.user_data
@@ -11,5 +12,8 @@ class BlockBulletCollisionHandler(CollisionHandler):
         block_health_component = block_entity.find_component(HealthComponent)
         block_health_component.health -= 0.1
         if block_health_component.at_min_health:
-            self._entity_manager.remove_entity(block_entity)
-        self._entity_manager.remove_entity(bullet_entity)
+            self._entity_manager.destroy_entity(block_entity)
+        if self.bullet_pool is not None:
+            self.bullet_pool.despawn(bullet_entity)
+        else:
+            self._entity_manager.destroy_entity(bullet_entity)
@@ -6,4 +6,4 @@ class BlockShipCollisionHandler(CollisionHandler):
 
     def on_collision_add(self, collision):
         ship_category, ship_entity = collision.body_b.user_data
-        self._entity_manager.remove_entity(ship_entity)
+        self._entity_manager.destroy_entity(ship_entity)
@@ -2,27 +2,30 @@ from drillion.animation_component import AnimationComponent
 from drillion.collision import CollisionBody
 from drillion.collision_component import CollisionComponent
 from drillion.entity import Entity
+from drillion.lifetime_component import LifetimeComponent
 from drillion.maths import Polygon2
 from drillion.physics_component import PhysicsComponent
-from drillion.sprite import PolygonSprite
+from drillion.sprite import BatchPolygonSprite
 from drillion.sprite_component import SpriteComponent
 from drillion.transform_component import TransformComponent
 
 class BulletEntityCreator(object):
-    def __init__(self, physics_update_phase, collision_transform_update_phase,
-                 animation_update_phase, draw_phase, collision_detector,
-                 batch):
+    def __init__(self, physics_update_phase, transform_hierarchy,
+                 collision_transform_update_phase, draw_phase,
+                 lifetime_system, collision_detector, sprite_batch):
         self._physics_update_phase = physics_update_phase
+        self._transform_hierarchy = transform_hierarchy
         self._collision_transform_update_phase = \
             collision_transform_update_phase
-        self._animation_update_phase = animation_update_phase
         self._draw_phase = draw_phase
+        self._lifetime_system = lifetime_system
         self._collision_detector = collision_detector
-        self._batch = batch
+        self._sprite_batch = sprite_batch
 
     def create(self, position=(0.0, 0.0), velocity=(0.0, 0.0),
-               color=(255, 255, 255, 255)):
-        transform_component = TransformComponent()
+               color=(255, 255, 255, 255), lifetime=3.0):
+        transform_component = \
+            TransformComponent(hierarchy=self._transform_hierarchy)
 
         physics_component = PhysicsComponent(transform_component,
                                              self._physics_update_phase,
@@ -38,24 +41,29 @@ class BulletEntityCreator(object):
                                self._collision_transform_update_phase,
                                collision_body, self._collision_detector)
 
-        sprite_radius = 0.1
-        sprite_vertices = [
-            (-sprite_radius, -sprite_radius),
-            (sprite_radius, -sprite_radius),
-            (sprite_radius, sprite_radius),
-            (-sprite_radius, sprite_radius),
-        ]
-        sprite = PolygonSprite(sprite_vertices, color=color)
-        sprite_component = SpriteComponent(sprite, self._batch)
+        sprite = BatchPolygonSprite(self._get_sprite_vertices(), color=color)
+        sprite_component = SpriteComponent(sprite, self._sprite_batch)
 
         animation_component = AnimationComponent(transform_component,
                                                  sprite_component,
-                                                 self._animation_update_phase,
                                                  self._draw_phase)
 
+        lifetime_component = LifetimeComponent(transform_component,
+                                               self._lifetime_system,
+                                               lifetime=lifetime)
+
         components = [transform_component, physics_component,
                       collision_component, sprite_component,
-                      animation_component]
-        entity = Entity(components)
+                      animation_component, lifetime_component]
+        entity = Entity(components, category='bullet')
         collision_body.user_data = 'bullet', entity
         return entity
+
+    def _get_sprite_vertices(self):
+        sprite_radius = 0.1
+        return [
+            (-sprite_radius, -sprite_radius),
+            (sprite_radius, -sprite_radius),
+            (sprite_radius, sprite_radius),
+            (-sprite_radius, sprite_radius),
+        ]
@@ -0,0 +1,67 @@
+from drillion.colors import WHITE
+from drillion.lifetime_component import LifetimeComponent
+from drillion.physics_component import PhysicsComponent
+from drillion.sprite_component import SpriteComponent
+
+from collections import deque, OrderedDict
+
+class BulletPool(object):
+    def __init__(self, bullet_entity_creator, entity_manager, capacity=256):
+        self._entity_manager = entity_manager
+        self._capacity = capacity
+        self._free_entities = deque(bullet_entity_creator.create()
+                                    for _ in xrange(capacity))
+        self._active_entities = OrderedDict()
+        self._lifetime = None
+        for entity in self._free_entities:
+            lifetime_component = entity.find_component(LifetimeComponent)
+            lifetime_component.on_expire = self.despawn
+            self._lifetime = lifetime_component.lifetime
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def active_count(self):
+        return len(self._active_entities)
+
+    def iter_active_entities(self):
+        return iter(self._active_entities)
+
+    def spawn(self, position=(0.0, 0.0), velocity=(0.0, 0.0), color=WHITE,
+              lifetime=None):
+        # Recycle the oldest bullet when the pool is exhausted.
+        if not self._free_entities:
+            oldest_entity = next(iter(self._active_entities))
+            self.despawn(oldest_entity)
+        entity = self._free_entities.popleft()
+
+        # Despawned bullets are destroyed when the entity manager flushes.
+        # Reclaim one that is still waiting for that right away.
+        if entity.key != -1:
+            self._entity_manager.remove_entity(entity)
+
+        physics_component = entity.find_component(PhysicsComponent)
+        physics_component.reset(position=position, velocity=velocity)
+        sprite_component = entity.find_component(SpriteComponent)
+        sprite_component.sprite.color = color
+        lifetime_component = entity.find_component(LifetimeComponent)
+        lifetime_component.lifetime = \
+            self._lifetime if lifetime is None else lifetime
+
+        self._entity_manager.add_entity(entity)
+        self._active_entities[entity] = None
+        return entity
+
+    def despawn(self, entity):
+        if entity not in self._active_entities:
+            return
+        del self._active_entities[entity]
+        self._entity_manager.destroy_entity(entity)
+        self._free_entities.append(entity)
+
+    def delete(self):
+        for entity in list(self._active_entities):
+            self.despawn(entity)
+        self._entity_manager.flush()
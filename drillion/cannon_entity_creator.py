@@ -3,15 +3,14 @@ from drillion.collision import CollisionBody
 from drillion.collision_component import CollisionComponent
 from drillion.entity import Entity
 from drillion.maths import Polygon2, Transform2
-from drillion.sprite import PolygonSprite
+from drillion.sprite import BatchPolygonSprite
 from drillion.sprite_component import SpriteComponent
 from drillion.transform_component import TransformComponent
 
 import random
 
 class CannonEntityCreator(object):
-    def __init__(self, animation_update_phase, draw_phase, batch):
-        self._animation_update_phase = animation_update_phase
+    def __init__(self, draw_phase, batch):
         self._draw_phase = draw_phase
         self._batch = batch
 
@@ -30,13 +29,12 @@ class CannonEntityCreator(object):
         transform_component = \
             TransformComponent(transform, parent=parent_transform_component)
 
-        sprite = PolygonSprite(vertices, color=color, transform=transform)
+        sprite = BatchPolygonSprite(vertices, color=color, transform=transform)
         sprite_component = SpriteComponent(sprite, self._batch)
         animation_component = AnimationComponent(transform_component,
                                                  sprite_component,
-                                                 self._animation_update_phase,
                                                  self._draw_phase)
 
         components = [transform_component, sprite_component,
                       animation_component]
-        return Entity(components, parent=ship_entity)
+        return Entity(components, parent=ship_entity, category='cannon')
@@ -1,20 +1,48 @@
-from drillion.maths import Box2, Polygon2, Transform2
+from drillion.maths import (Box2, intersect_convex_polygons, Polygon2,
+                            Transform2, Vector2)
 
 from collections import defaultdict
-from math import floor
+from math import floor, hypot
+from multiprocessing.sharedctypes import RawArray
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+DEFAULT_CATEGORY_BITS = 0x1
+DEFAULT_MASK_BITS = 0xffffffff
+
+_BODY_KIND = 0
+_TILE_KIND = 1
 
 class CollisionBody(object):
-    def __init__(self, polygon, transform=Transform2(), user_data=None):
+    def __init__(self, polygon, transform=Transform2(), user_data=None,
+                 static=False, category_bits=None, mask_bits=None):
         self._polygon = Polygon2(polygon)
         self._transform = Transform2(*transform)
         self.user_data = user_data
+        self._static = static
+        self.category_bits = category_bits
+        self.mask_bits = mask_bits
+        self._category_bits = DEFAULT_CATEGORY_BITS
+        self._mask_bits = DEFAULT_MASK_BITS
         self._detector = None
         self._key = -1
+        self._collision_id = -1
         self._collisions = []
         self._world_polygon = Polygon2(polygon)
         self._world_bounds = Box2()
         self._grid_bounds = (0, 0), (0, 0)
         self._dirty = False
+        self._world_polygon_stale = False
+
+        # Point bodies are swept from their previous world position, and
+        # their world polygon switches between a point and a segment.
+        self._swept = False
+        if len(self._polygon) == 1:
+            self._point_vertices = list(self._world_polygon)
+            self._segment_vertices = self._point_vertices + [Vector2()]
 
     @property
     def key(self):
@@ -24,6 +52,10 @@ class CollisionBody(object):
     def transform(self):
         return self._transform
 
+    @property
+    def static(self):
+        return self._static
+
     @property
     def dirty(self):
         return self._dirty
@@ -35,11 +67,69 @@ class CollisionBody(object):
             self._dirty = True
 
     def _update_world_geometry(self):
+        if len(self._polygon) == 1:
+            self._update_swept_geometry()
+            return
         self._world_bounds.clear()
         for vertex, world_vertex in zip(self._polygon, self._world_polygon):
             world_vertex.assign(*self._transform.transform_point(*vertex))
             self._world_bounds.add_point(*world_vertex)
 
+    def _update_swept_geometry(self):
+        current_vertex, previous_vertex = self._segment_vertices
+        previous_vertex.assign(*current_vertex)
+        current_vertex.assign(*self._transform.transform_point(
+            *self._polygon[0]))
+        if self._swept and (previous_vertex.x != current_vertex.x or
+                            previous_vertex.y != current_vertex.y):
+            self._world_polygon.vertices = self._segment_vertices
+        else:
+            self._world_polygon.vertices = self._point_vertices
+        self._swept = True
+
+        self._world_bounds.clear()
+        for world_vertex in self._world_polygon:
+            self._world_bounds.add_point(*world_vertex)
+
+    def _get_world_polygon(self):
+        if self._world_polygon_stale:
+            vertices = self._detector._arrays.get_world_vertices(self._key)
+            if len(self._polygon) == 1:
+                if len(vertices) == 1:
+                    self._world_polygon.vertices = self._point_vertices
+                else:
+                    self._world_polygon.vertices = self._segment_vertices
+            for world_vertex, (x, y) in zip(self._world_polygon, vertices):
+                world_vertex.assign(x, y)
+            self._world_polygon_stale = False
+        return self._world_polygon
+
+    def __str__(self):
+        return '#%d' % self._key
+
+class CollisionTile(object):
+    def __init__(self, grid_position, user_data=None, category_bits=None,
+                 mask_bits=None):
+        self._grid_position = tuple(grid_position)
+        self.user_data = user_data
+        self.category_bits = category_bits
+        self.mask_bits = mask_bits
+        self._category_bits = DEFAULT_CATEGORY_BITS
+        self._mask_bits = DEFAULT_MASK_BITS
+        self._detector = None
+        self._key = -1
+        self._collision_id = -1
+        self._collisions = []
+        self._dirty = False
+
+    @property
+    def key(self):
+        return self._key
+
+    @property
+    def grid_position(self):
+        return self._grid_position
+
     def __str__(self):
         return '#%d' % self._key
 
@@ -48,10 +138,50 @@ class Collision(object):
         self.body_a = body_a
         self.body_b = body_b
         self.user_data = user_data
+        self._key = _get_collision_key(body_a, body_b)
+        self._active = False
 
     def __str__(self):
         return '%s %s' % (self.body_a, self.body_b)
 
+def _get_collision_key(body_a, body_b):
+    if body_a._collision_id < body_b._collision_id:
+        return body_a._collision_id, body_b._collision_id
+    else:
+        return body_b._collision_id, body_a._collision_id
+
+class CollisionFilter(object):
+    def __init__(self, category_pairs=[]):
+        self._category_bits = {}
+        self._mask_bits = defaultdict(int)
+        for category_a, category_b in category_pairs:
+            self._mask_bits[category_a] |= self.add_category(category_b)
+            self._mask_bits[category_b] |= self.add_category(category_a)
+
+    def add_category(self, category):
+        category_bits = self._category_bits.get(category)
+        if category_bits is None:
+            category_bits = 1 << len(self._category_bits)
+            self._category_bits[category] = category_bits
+        return category_bits
+
+    def get_category_bits(self, category):
+        return self._category_bits.get(category, 0)
+
+    def get_mask_bits(self, category):
+        return self._mask_bits.get(category, 0)
+
+def _should_collide(body_a, body_b):
+    return (body_a._category_bits & body_b._mask_bits != 0 and
+            body_b._category_bits & body_a._mask_bits != 0)
+
+def _get_category(body):
+    user_data = body.user_data
+    if isinstance(user_data, tuple):
+        return user_data[0]
+    else:
+        return user_data
+
 class CollisionListener(object):
     def on_collision_add(self, collision):
         pass
@@ -59,7 +189,24 @@ class CollisionListener(object):
     def on_collision_remove(self, collision):
         pass
 
-class CollisionGrid(object):
+class Broadphase(object):
+    def update_body(self, body):
+        pass
+
+    def remove_body(self, body):
+        pass
+
+    def remove_bodies(self, bodies):
+        for body in bodies:
+            self.remove_body(body)
+
+    def find_collisions(self, body):
+        return iter(())
+
+    def query_box(self, bounds):
+        return iter(())
+
+class CollisionGrid(Broadphase):
     def __init__(self, cell_size=1.0):
         self._cell_size = cell_size
         self._cells = defaultdict(list)
@@ -75,7 +222,27 @@ class CollisionGrid(object):
         (grid_x1, grid_y1), (grid_x2, grid_y2) = body._grid_bounds
         for grid_x in xrange(grid_x1, grid_x2):
             for grid_y in xrange(grid_y1, grid_y2):
-                self._cells[grid_x, grid_y].remove(body)
+                cell = self._cells[grid_x, grid_y]
+                cell.remove(body)
+                if not cell:
+                    del self._cells[grid_x, grid_y]
+        body._grid_bounds = (0, 0), (0, 0)
+
+    def remove_bodies(self, bodies):
+        # Filter every affected cell once instead of once per body.
+        removed_bodies = set(bodies)
+        grid_positions = set()
+        for body in bodies:
+            (grid_x1, grid_y1), (grid_x2, grid_y2) = body._grid_bounds
+            for grid_x in xrange(grid_x1, grid_x2):
+                for grid_y in xrange(grid_y1, grid_y2):
+                    grid_positions.add((grid_x, grid_y))
+            body._grid_bounds = (0, 0), (0, 0)
+        for grid_position in grid_positions:
+            cell = self._cells[grid_position]
+            cell[:] = [body for body in cell if body not in removed_bodies]
+            if not cell:
+                del self._cells[grid_position]
 
     def update_body(self, body):
         grid_bounds = self._get_grid_bounds(body._world_bounds)
@@ -93,63 +260,857 @@ class CollisionGrid(object):
         return (grid_x1, grid_y1), (grid_x2, grid_y2)
 
     def find_collisions(self, body):
-        bounds = body._world_bounds
-        (grid_x1, grid_y1), (grid_x2, grid_y2) = body._grid_bounds
-        collisions = set()
+        return self._query_box(body._world_bounds, body)
+
+    def query_box(self, bounds):
+        return self._query_box(bounds, None)
+
+    def _query_box(self, bounds, body):
+        (grid_x1, grid_y1), (grid_x2, grid_y2) = \
+            self._get_grid_bounds(bounds)
         for grid_x in xrange(grid_x1, grid_x2):
             for grid_y in xrange(grid_y1, grid_y2):
-                collisions.update(self._cells[grid_x, grid_y])
-        for other_body in collisions:
+                for other_body in self._cells.get((grid_x, grid_y), ()):
+                    if body is not None and (other_body is body or
+                            not _should_collide(body, other_body)):
+                        continue
+
+                    # Report a body spanning several cells only from the
+                    # first cell that both it and the query cover.
+                    (other_x1, other_y1), _ = other_body._grid_bounds
+                    if grid_x == max(grid_x1, other_x1) and \
+                            grid_y == max(grid_y1, other_y1) and \
+                            bounds.intersects(other_body._world_bounds):
+                        yield other_body
+
+class _SweepEndpoint(object):
+    def __init__(self, proxy, is_max):
+        self.proxy = proxy
+        self.is_max = is_max
+        self.value = float('inf')
+        self.index = -1
+
+class _SweepProxy(object):
+    def __init__(self, body):
+        self.body = body
+        self.min_endpoint = _SweepEndpoint(self, False)
+        self.max_endpoint = _SweepEndpoint(self, True)
+        self.overlaps = set()
+
+class SweepAndPrune(Broadphase):
+    def __init__(self):
+        self._endpoints = []
+        self._proxies = {}
+        self._max_width = 0.0
+
+    def update_body(self, body):
+        proxy = self._proxies.get(body)
+        if proxy is None:
+            proxy = _SweepProxy(body)
+            self._proxies[body] = proxy
+            for endpoint in proxy.min_endpoint, proxy.max_endpoint:
+                endpoint.index = len(self._endpoints)
+                self._endpoints.append(endpoint)
+        min_value = body._world_bounds.p1.x
+        max_value = body._world_bounds.p2.x
+        self._max_width = max(self._max_width, max_value - min_value)
+        moving_right = min_value > proxy.min_endpoint.value
+        proxy.min_endpoint.value = min_value
+        proxy.max_endpoint.value = max_value
+
+        # Sort the leading endpoint first so that neither endpoint gets
+        # stuck behind the other one at its old position.
+        if moving_right:
+            self._sort_endpoint(proxy.max_endpoint)
+            self._sort_endpoint(proxy.min_endpoint)
+        else:
+            self._sort_endpoint(proxy.min_endpoint)
+            self._sort_endpoint(proxy.max_endpoint)
+
+    def remove_body(self, body):
+        proxy = self._proxies.pop(body, None)
+        if proxy is None:
+            return
+        for other_proxy in proxy.overlaps:
+            other_proxy.overlaps.discard(proxy)
+        del self._endpoints[proxy.max_endpoint.index]
+        del self._endpoints[proxy.min_endpoint.index]
+        for index in xrange(proxy.min_endpoint.index, len(self._endpoints)):
+            self._endpoints[index].index = index
+
+    def remove_bodies(self, bodies):
+        removed_proxies = set()
+        for body in bodies:
+            proxy = self._proxies.pop(body, None)
+            if proxy is not None:
+                removed_proxies.add(proxy)
+        if not removed_proxies:
+            return
+        for proxy in removed_proxies:
+            for other_proxy in proxy.overlaps:
+                other_proxy.overlaps.discard(proxy)
+        self._endpoints = [endpoint for endpoint in self._endpoints
+                           if endpoint.proxy not in removed_proxies]
+        for index, endpoint in enumerate(self._endpoints):
+            endpoint.index = index
+        self._max_width = max([proxy.max_endpoint.value -
+                               proxy.min_endpoint.value
+                               for proxy in self._proxies.itervalues()] or
+                              [0.0])
+
+    def find_collisions(self, body):
+        bounds = body._world_bounds
+        proxy = self._proxies.get(body)
+        if proxy is not None:
+            other_bodies = (other_proxy.body
+                            for other_proxy in proxy.overlaps)
+        else:
+            # Bodies from the other broadphase have no proxy here, so look
+            # them up by their bounds instead.
+            other_bodies = self.query_box(bounds)
+        for other_body in other_bodies:
             if other_body is not body and \
+                    _should_collide(body, other_body) and \
                     bounds.intersects(other_body._world_bounds):
                 yield other_body
 
+    def query_box(self, bounds):
+        # A body that overlaps the box starts at most one body width to the
+        # left of it, so the scan can start there.
+        x1 = bounds.p1.x - self._max_width
+        x2 = bounds.p2.x
+        endpoints = self._endpoints
+        for index in xrange(self._find_endpoint_index(x1), len(endpoints)):
+            endpoint = endpoints[index]
+            if endpoint.value > x2:
+                break
+            if not endpoint.is_max:
+                body = endpoint.proxy.body
+                if bounds.intersects(body._world_bounds):
+                    yield body
+
+    def _find_endpoint_index(self, value):
+        endpoints = self._endpoints
+        low = 0
+        high = len(endpoints)
+        while low < high:
+            middle = (low + high) // 2
+            if endpoints[middle].value < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _sort_endpoint(self, endpoint):
+        # Endpoints stay nearly sorted between frames, so an insertion sort
+        # step is cheap. Each swap with another body's endpoint of the
+        # opposite kind starts or ends an overlap on the x-axis.
+        endpoints = self._endpoints
+        index = endpoint.index
+        value = endpoint.value
+        while index > 0 and endpoints[index - 1].value > value:
+            other_endpoint = endpoints[index - 1]
+            if other_endpoint.is_max != endpoint.is_max:
+                if endpoint.is_max:
+                    self._remove_overlap(endpoint.proxy, other_endpoint.proxy)
+                else:
+                    self._add_overlap(endpoint.proxy, other_endpoint.proxy)
+            endpoints[index] = other_endpoint
+            other_endpoint.index = index
+            index -= 1
+        while index + 1 < len(endpoints) and endpoints[index + 1].value < value:
+            other_endpoint = endpoints[index + 1]
+            if other_endpoint.is_max != endpoint.is_max:
+                if endpoint.is_max:
+                    self._add_overlap(endpoint.proxy, other_endpoint.proxy)
+                else:
+                    self._remove_overlap(endpoint.proxy, other_endpoint.proxy)
+            endpoints[index] = other_endpoint
+            other_endpoint.index = index
+            index += 1
+        endpoints[index] = endpoint
+        endpoint.index = index
+
+    def _add_overlap(self, proxy_a, proxy_b):
+        if proxy_a is not proxy_b:
+            proxy_a.overlaps.add(proxy_b)
+            proxy_b.overlaps.add(proxy_a)
+
+    def _remove_overlap(self, proxy_a, proxy_b):
+        proxy_a.overlaps.discard(proxy_b)
+        proxy_b.overlaps.discard(proxy_a)
+
+class CollisionTileMap(object):
+    def __init__(self, tile_size=1.0, chunk_size=16):
+        self._tile_size = tile_size
+        self._chunk_size = chunk_size
+        self._chunks = {}
+        self._chunk_tile_counts = {}
+        self._tile_count = 0
+        self._tile_bounds = Box2()
+
+    @property
+    def tile_size(self):
+        return self._tile_size
+
+    @property
+    def chunk_size(self):
+        return self._chunk_size
+
+    def __len__(self):
+        return self._tile_count
+
+    def add_tile(self, tile):
+        grid_x, grid_y = tile._grid_position
+        chunk_position, index = self._get_chunk_index(grid_x, grid_y)
+        chunk = self._chunks.get(chunk_position)
+        if chunk is None:
+            chunk = [None] * (self._chunk_size * self._chunk_size)
+            self._chunks[chunk_position] = chunk
+            self._chunk_tile_counts[chunk_position] = 0
+        if chunk[index] is not None:
+            raise ValueError('Tile position is occupied: %s' %
+                             (tile._grid_position,))
+        chunk[index] = tile
+        self._chunk_tile_counts[chunk_position] += 1
+        self._tile_count += 1
+
+    def remove_tile(self, tile):
+        grid_x, grid_y = tile._grid_position
+        chunk_position, index = self._get_chunk_index(grid_x, grid_y)
+        chunk = self._chunks.get(chunk_position)
+        if chunk is None or chunk[index] is not tile:
+            raise ValueError('Tile is not in tile map')
+        chunk[index] = None
+        self._tile_count -= 1
+
+        # Free empty chunks so that storage follows the loaded terrain
+        # rather than every position that has ever held a tile.
+        self._chunk_tile_counts[chunk_position] -= 1
+        if not self._chunk_tile_counts[chunk_position]:
+            del self._chunks[chunk_position]
+            del self._chunk_tile_counts[chunk_position]
+
+    def get_tile(self, grid_x, grid_y):
+        chunk_position, index = self._get_chunk_index(grid_x, grid_y)
+        chunk = self._chunks.get(chunk_position)
+        if chunk is None:
+            return None
+        return chunk[index]
+
+    def query_point(self, x, y):
+        grid_x = int(floor(x / self._tile_size))
+        grid_y = int(floor(y / self._tile_size))
+        tile = self.get_tile(grid_x, grid_y)
+        if tile is not None and \
+                self._get_tile_bounds(grid_x, grid_y).contains_point(x, y):
+            return tile
+        return None
+
+    def find_tiles(self, bounds):
+        for grid_x, grid_y, tile in self._iter_tiles(bounds):
+            if bounds.intersects(self._get_tile_bounds(grid_x, grid_y)):
+                yield tile
+
+    def ray_cast(self, x1, y1, x2, y2):
+        # Walk the tiles along the segment in order and stop at the first
+        # tile that it enters.
+        tile_size = self._tile_size
+        grid_x = int(floor(x1 / tile_size))
+        grid_y = int(floor(y1 / tile_size))
+        end_grid_x = int(floor(x2 / tile_size))
+        end_grid_y = int(floor(y2 / tile_size))
+        dx = x2 - x1
+        dy = y2 - y1
+        step_x, t_max_x, t_delta_x = self._get_ray_steps(x1, dx, grid_x)
+        step_y, t_max_y, t_delta_y = self._get_ray_steps(y1, dy, grid_y)
+        while True:
+            tile = self.get_tile(grid_x, grid_y)
+            if tile is not None:
+                fraction = self._get_tile_bounds(grid_x, grid_y). \
+                    intersect_segment(x1, y1, x2, y2)
+                if fraction is not None:
+                    return tile, fraction
+            if grid_x == end_grid_x and grid_y == end_grid_y:
+                return None
+            if t_max_x < t_max_y:
+                if t_max_x > 1.0:
+                    return None
+                grid_x += step_x
+                t_max_x += t_delta_x
+            else:
+                if t_max_y > 1.0:
+                    return None
+                grid_y += step_y
+                t_max_y += t_delta_y
+
+    def _get_ray_steps(self, start, delta, grid_start):
+        if delta > 0.0:
+            boundary = self._tile_size * float(grid_start + 1)
+            return 1, (boundary - start) / delta, self._tile_size / delta
+        elif delta < 0.0:
+            boundary = self._tile_size * float(grid_start)
+            return -1, (boundary - start) / delta, -self._tile_size / delta
+        else:
+            return 0, float('inf'), float('inf')
+
+    def find_collisions(self, body):
+        bounds = body._world_bounds
+        polygon = body._get_world_polygon()
+        for grid_x, grid_y, tile in self._iter_tiles(bounds):
+            if not _should_collide(body, tile):
+                continue
+            tile_bounds = self._get_tile_bounds(grid_x, grid_y)
+            # A single vertex is inside the tile whenever the bounds
+            # overlap.
+            if bounds.intersects(tile_bounds) and \
+                    (len(polygon) == 1 or
+                     polygon.intersects_box(tile_bounds)):
+                yield tile
+
+    def _iter_tiles(self, bounds):
+        # Visit only the loaded chunks that the bounds overlap, and only
+        # the part of each chunk that lies inside the bounds.
+        x1, y1 = bounds.p1
+        x2, y2 = bounds.p2
+        grid_x1 = int(floor(x1 / self._tile_size))
+        grid_y1 = int(floor(y1 / self._tile_size))
+        grid_x2 = int(floor(x2 / self._tile_size)) + 1
+        grid_y2 = int(floor(y2 / self._tile_size)) + 1
+        chunk_size = self._chunk_size
+        for chunk_x in xrange(grid_x1 // chunk_size,
+                              (grid_x2 - 1) // chunk_size + 1):
+            for chunk_y in xrange(grid_y1 // chunk_size,
+                                  (grid_y2 - 1) // chunk_size + 1):
+                chunk = self._chunks.get((chunk_x, chunk_y))
+                if chunk is None:
+                    continue
+                origin_x = chunk_x * chunk_size
+                origin_y = chunk_y * chunk_size
+                for grid_x in xrange(max(grid_x1, origin_x),
+                                     min(grid_x2, origin_x + chunk_size)):
+                    row = (grid_x - origin_x) * chunk_size - origin_y
+                    for grid_y in xrange(max(grid_y1, origin_y),
+                                         min(grid_y2, origin_y + chunk_size)):
+                        tile = chunk[row + grid_y]
+                        if tile is not None:
+                            yield grid_x, grid_y, tile
+
+    def _get_chunk_index(self, grid_x, grid_y):
+        chunk_size = self._chunk_size
+        chunk_x, x = divmod(grid_x, chunk_size)
+        chunk_y, y = divmod(grid_y, chunk_size)
+        return (chunk_x, chunk_y), x * chunk_size + y
+
+    def _get_tile_bounds(self, grid_x, grid_y):
+        self._tile_bounds.p1.assign(self._tile_size * float(grid_x),
+                                    self._tile_size * float(grid_y))
+        self._tile_bounds.p2.assign(self._tile_size * float(grid_x + 1),
+                                    self._tile_size * float(grid_y + 1))
+        return self._tile_bounds
+
+class CollisionBodyArrays(object):
+    def __init__(self, capacity=256, max_vertex_count=8, shared=False):
+        if numpy is None:
+            raise ImportError('CollisionBodyArrays requires NumPy')
+        if max_vertex_count < 2:
+            raise ValueError('Swept point bodies need two vertices')
+        self._capacity = 0
+        self._max_vertex_count = max_vertex_count
+        self._shared = shared
+        self._shared_buffers = {}
+        self._generation = 0
+        self._vertices = numpy.zeros((0, max_vertex_count, 2))
+        self._vertex_counts = numpy.zeros(0, dtype=numpy.int32)
+        self._transforms = numpy.zeros((0, 6))
+        self._world_vertices = numpy.zeros((0, max_vertex_count, 2))
+        self._world_vertex_counts = numpy.zeros(0, dtype=numpy.int32)
+        self._world_bounds = numpy.zeros((0, 4))
+        self._swept = numpy.zeros(0, dtype=bool)
+        self._reserve(capacity)
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def max_vertex_count(self):
+        return self._max_vertex_count
+
+    @property
+    def shared(self):
+        return self._shared
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @property
+    def shared_buffers(self):
+        return (self._shared_buffers['world_vertices'],
+                self._shared_buffers['world_vertex_counts'])
+
+    @property
+    def vertex_counts(self):
+        return self._vertex_counts
+
+    @property
+    def transforms(self):
+        return self._transforms
+
+    @property
+    def world_vertices(self):
+        return self._world_vertices
+
+    @property
+    def world_vertex_counts(self):
+        return self._world_vertex_counts
+
+    @property
+    def world_bounds(self):
+        return self._world_bounds
+
+    def add_body(self, body):
+        vertex_count = len(body._polygon)
+        if not 1 <= vertex_count <= self._max_vertex_count:
+            raise ValueError('Unsupported polygon vertex count: %d' %
+                             vertex_count)
+        key = body._key
+        self._reserve(key + 1)
+
+        # Pad with the first vertex so that every row is a closed polygon
+        # that yields the same bounds and edges as the unpadded one.
+        vertices = [tuple(vertex) for vertex in body._polygon]
+        vertices.extend(vertices[:1] * (self._max_vertex_count - vertex_count))
+        self._vertices[key] = vertices
+        self._vertex_counts[key] = vertex_count
+        self._world_vertex_counts[key] = vertex_count
+        self._swept[key] = False
+
+    def remove_body(self, body):
+        self._vertex_counts[body._key] = 0
+        self._world_vertex_counts[body._key] = 0
+
+    def update(self, bodies):
+        if not bodies:
+            return
+        keys = numpy.fromiter((body._key for body in bodies), dtype=numpy.intp,
+                              count=len(bodies))
+        transforms = numpy.array([tuple(body._transform) for body in bodies])
+        self._transforms[keys] = transforms
+
+        previous_points = self._world_vertices[keys, 0]
+
+        a, b, c, d, e, f = (transforms[:, i, None] for i in xrange(6))
+        x = self._vertices[keys, :, 0]
+        y = self._vertices[keys, :, 1]
+        world_vertices = numpy.empty((len(keys), self._max_vertex_count, 2))
+        world_vertices[:, :, 0] = a * x + b * y + c
+        world_vertices[:, :, 1] = d * x + e * y + f
+
+        # Point bodies that moved become a segment from their current to
+        # their previous position.
+        vertex_counts = self._vertex_counts[keys]
+        swept = ((vertex_counts == 1) & self._swept[keys] &
+                 (previous_points != world_vertices[:, 0]).any(axis=1))
+        world_vertices[swept, 1] = previous_points[swept]
+        self._world_vertices[keys] = world_vertices
+        self._world_vertex_counts[keys] = numpy.where(swept, 2, vertex_counts)
+        self._swept[keys] = True
+
+        world_bounds = numpy.hstack((world_vertices.min(axis=1),
+                                     world_vertices.max(axis=1)))
+        self._world_bounds[keys] = world_bounds
+
+        for body, (x1, y1, x2, y2) in zip(bodies, world_bounds.tolist()):
+            body._world_bounds.p1.assign(x1, y1)
+            body._world_bounds.p2.assign(x2, y2)
+            body._world_polygon_stale = True
+
+    def intersect_pairs(self, keys_a, keys_b):
+        keys_a = numpy.asarray(keys_a, dtype=numpy.intp)
+        keys_b = numpy.asarray(keys_b, dtype=numpy.intp)
+        return intersect_convex_polygons(self._world_vertices[keys_a],
+                                         self._world_vertex_counts[keys_a],
+                                         self._world_vertices[keys_b],
+                                         self._world_vertex_counts[keys_b])
+
+    def get_world_vertices(self, key):
+        vertex_count = self._world_vertex_counts[key]
+        return self._world_vertices[key, :vertex_count].tolist()
+
+    def _reserve(self, capacity):
+        if capacity <= self._capacity:
+            return
+        new_capacity = max(capacity, 2 * self._capacity)
+        self._vertices = self._grow(self._vertices, new_capacity)
+        self._vertex_counts = self._grow(self._vertex_counts, new_capacity)
+        self._transforms = self._grow(self._transforms, new_capacity)
+        self._world_vertices = self._grow(self._world_vertices, new_capacity,
+                                          'world_vertices')
+        self._world_vertex_counts = self._grow(self._world_vertex_counts,
+                                               new_capacity,
+                                               'world_vertex_counts')
+        self._world_bounds = self._grow(self._world_bounds, new_capacity)
+        self._swept = self._grow(self._swept, new_capacity)
+        self._capacity = new_capacity
+        self._generation += 1
+
+    def _grow(self, array, capacity, shared_name=None):
+        shape = (capacity,) + array.shape[1:]
+        if self._shared and shared_name is not None:
+            # Arrays read by narrowphase worker processes live in shared
+            # memory.
+            size = int(numpy.prod(shape)) * array.dtype.itemsize
+            buffer = RawArray('b', size)
+            self._shared_buffers[shared_name] = buffer
+            new_array = numpy.frombuffer(buffer, dtype=array.dtype)
+            new_array = new_array.reshape(shape)
+        else:
+            new_array = numpy.zeros(shape, dtype=array.dtype)
+        new_array[:len(array)] = array
+        return new_array
+
 class CollisionDetector(object):
-    def __init__(self, listener=None):
-        self._grid = CollisionGrid(2.0)
+    def __init__(self, listener=None, arrays=None, broadphase=None,
+                 static_broadphase=None, tile_map=None,
+                 collision_filter=None, narrowphase=None):
+        if broadphase is None:
+            broadphase = CollisionGrid(2.0)
+        if static_broadphase is None:
+            static_broadphase = CollisionGrid(2.0)
+        self._broadphase = broadphase
+        self._static_broadphase = static_broadphase
+        if tile_map is None:
+            tile_map = CollisionTileMap(2.0)
+        self._tile_map = tile_map
+        self._collision_filter = collision_filter
+        self._arrays = arrays
+        if narrowphase is None:
+            narrowphase = arrays
+        elif arrays is None:
+            raise ValueError('A batch narrowphase requires an arrays store')
+        self._narrowphase = narrowphase
         self._bodies = []
         self._dirty_bodies = []
-        self._collisions = []
+        self._removed_bodies = []
+        self._batch_depth = 0
+        self._collisions = {}
         self._listener = listener
-        self._next_key = 0
+
+        # Bodies and tiles have separate key spaces, so that body keys
+        # stay dense for the arrays store. Collision ids tag the key with
+        # its kind.
+        self._next_keys = [0, 0]
+        self._free_keys = [], []
 
     def add_body(self, body):
         self._bodies.append(body)
         body._detector = self
-        body._key = self._next_key
-        self._next_key += 1
+        body._swept = False
+        body._key = self._generate_key(_BODY_KIND)
+        body._collision_id = 2 * body._key + _BODY_KIND
+        self._update_bits(body)
+        if self._arrays is not None:
+            self._arrays.add_body(body)
 
         body._dirty = True
         self._dirty_bodies.append(body)
-        body._grid_bounds = (0, 0), (0, 0)
 
     def remove_body(self, body):
-        self._grid.remove_body(body)
+        if self._batch_depth:
+            self._removed_bodies.append(body)
+        else:
+            self.remove_bodies([body])
+
+    def remove_bodies(self, bodies):
+        for broadphase in self._broadphase, self._static_broadphase:
+            broadphase.remove_bodies([body for body in bodies
+                                      if self._get_broadphase(body) is
+                                      broadphase])
+        for body in bodies:
+            self._remove_collisions(body._collisions)
+            if self._arrays is not None:
+                self._arrays.remove_body(body)
+            self._free_keys[_BODY_KIND].append(body._key)
+            body._key = -1
+            body._collision_id = -1
+            body._world_polygon_stale = False
+            body._detector = None
+
+        removed_bodies = set(bodies)
+        self._dirty_bodies = [body for body in self._dirty_bodies
+                              if body not in removed_bodies]
+        self._bodies = [body for body in self._bodies
+                        if body not in removed_bodies]
+
+    def begin_batch(self):
+        self._batch_depth += 1
+
+    def end_batch(self):
+        # Bodies removed during a batch are taken out of the broadphases
+        # and body lists together when the outermost batch ends.
+        self._batch_depth -= 1
+        if not self._batch_depth and self._removed_bodies:
+            bodies = self._removed_bodies
+            self._removed_bodies = []
+            self.remove_bodies(bodies)
+
+    def add_tile(self, tile):
+        tile._detector = self
+        tile._key = self._generate_key(_TILE_KIND)
+        tile._collision_id = 2 * tile._key + _TILE_KIND
+        self._update_bits(tile)
+        self._tile_map.add_tile(tile)
+
+    def remove_tile(self, tile):
+        self._tile_map.remove_tile(tile)
+        self._remove_collisions(tile._collisions)
+        self._free_keys[_TILE_KIND].append(tile._key)
+        tile._key = -1
+        tile._collision_id = -1
+        tile._detector = None
+
+    @property
+    def tile_map(self):
+        return self._tile_map
 
-        if body._dirty:
-            self._dirty_bodies.remove(body)
-        body._key = -1
-        body._detector = None
-        self._bodies.remove(body)
+    def query_aabb(self, bounds):
+        for body in self._broadphase.query_box(bounds):
+            yield body
+        for body in self._static_broadphase.query_box(bounds):
+            yield body
+        for tile in self._tile_map.find_tiles(bounds):
+            yield tile
+
+    def query_point(self, x, y):
+        bounds = Box2((x, y), (x, y))
+        for broadphase in self._broadphase, self._static_broadphase:
+            for body in broadphase.query_box(bounds):
+                if body._get_world_polygon().contains_point(x, y):
+                    yield body
+        tile = self._tile_map.query_point(x, y)
+        if tile is not None:
+            yield tile
+
+    def ray_cast(self, x1, y1, x2, y2):
+        result = self._tile_map.ray_cast(x1, y1, x2, y2)
+        scale = 1.0
+        if result is not None:
+            # Only bodies in front of the tile hit can be closer.
+            tile, scale = result
+            x2 = x1 + scale * (x2 - x1)
+            y2 = y1 + scale * (y2 - y1)
+        bounds = Box2()
+        bounds.clear()
+        bounds.add_point(x1, y1)
+        bounds.add_point(x2, y2)
+        for broadphase in self._broadphase, self._static_broadphase:
+            for body in broadphase.query_box(bounds):
+                fraction = body._get_world_polygon().intersect_segment(
+                    x1, y1, x2, y2)
+                if fraction is not None:
+                    fraction *= scale
+                    if result is None or fraction < result[1]:
+                        result = body, fraction
+        return result
+
+    def nearest(self, category, x, y, max_distance=100.0):
+        # Grow the search box until a match is found within its inscribed
+        # circle, which no unseen body can beat.
+        radius = self._tile_map.tile_size
+        bounds = Box2()
+        while True:
+            radius = min(radius, max_distance)
+            bounds.p1.assign(x - radius, y - radius)
+            bounds.p2.assign(x + radius, y + radius)
+            nearest_body = None
+            nearest_distance = radius
+            for body in self.query_aabb(bounds):
+                if _get_category(body) == category:
+                    center_x, center_y = self._get_center(body)
+                    distance = hypot(center_x - x, center_y - y)
+                    if distance <= nearest_distance:
+                        nearest_body = body
+                        nearest_distance = distance
+            if nearest_body is not None or radius >= max_distance:
+                return nearest_body
+            radius *= 2.0
+
+    def _get_center(self, body):
+        if isinstance(body, CollisionTile):
+            grid_x, grid_y = body._grid_position
+            tile_size = self._tile_map.tile_size
+            return (tile_size * (float(grid_x) + 0.5),
+                    tile_size * (float(grid_y) + 0.5))
+        else:
+            return body._world_bounds.center
+
+    @property
+    def collisions(self):
+        return self._collisions.itervalues()
 
     def update(self, dt):
-        collisions = []
+        if self._arrays is not None:
+            self._arrays.update(self._dirty_bodies)
+        updated_bodies = []
+        candidate_pairs = []
+        colliding_pairs = []
         while self._dirty_bodies:
             body = self._dirty_bodies.pop()
             body._dirty = False
+            updated_bodies.append(body)
+
+            if self._arrays is None:
+                body._update_world_geometry()
+            self._get_broadphase(body).update_body(body)
+            self._find_candidate_pairs(body, candidate_pairs, colliding_pairs)
+        colliding_pairs.extend(self._find_colliding_pairs(candidate_pairs))
+        colliding_pairs = self._keep_first_hits(colliding_pairs)
+
+        added_collisions = []
+        collision_keys = set()
+        for body, other_body in colliding_pairs:
+            key = _get_collision_key(body, other_body)
+            collision_keys.add(key)
+            if key not in self._collisions:
+                collision = self._add_collision(body, other_body)
+                added_collisions.append(collision)
+
+        removed_collisions = []
+        for body in updated_bodies:
+            for collision in body._collisions:
+                if collision._key not in collision_keys:
+                    collision_keys.add(collision._key)
+                    removed_collisions.append(collision)
+        self._remove_collisions(removed_collisions)
+
+        for collision in added_collisions:
+            if self._collisions.get(collision._key) is collision:
+                collision._active = True
+                if self._listener is not None:
+                    self._listener.on_collision_add(collision)
+
+    def _update_bits(self, body):
+        if self._collision_filter is not None:
+            category = _get_category(body)
+            category_bits = self._collision_filter.get_category_bits(category)
+            mask_bits = self._collision_filter.get_mask_bits(category)
+        else:
+            category_bits = DEFAULT_CATEGORY_BITS
+            mask_bits = DEFAULT_MASK_BITS
+        if body.category_bits is not None:
+            category_bits = body.category_bits
+        if body.mask_bits is not None:
+            mask_bits = body.mask_bits
+        body._category_bits = category_bits
+        body._mask_bits = mask_bits
+
+    def _get_broadphase(self, body):
+        if body._static:
+            return self._static_broadphase
+        else:
+            return self._broadphase
+
+    def _find_candidate_pairs(self, body, candidate_pairs, colliding_pairs):
+        # Static bodies and tiles are only tested against dynamic bodies.
+        if body._static:
+            broadphases = self._broadphase,
+        else:
+            broadphases = self._broadphase, self._static_broadphase
+        for broadphase in broadphases:
+            for other_body in broadphase.find_collisions(body):
+                if not other_body._dirty:
+                    candidate_pairs.append((body, other_body))
+        if not body._static:
+            for tile in self._tile_map.find_collisions(body):
+                colliding_pairs.append((body, tile))
+
+    def _find_colliding_pairs(self, candidate_pairs):
+        if not candidate_pairs:
+            return []
+        if self._arrays is None:
+            return [(body, other_body)
+                    for body, other_body in candidate_pairs
+                    if body._world_polygon.intersects(
+                        other_body._world_polygon)]
+        keys_a = [body._key for body, other_body in candidate_pairs]
+        keys_b = [other_body._key for body, other_body in candidate_pairs]
+        mask = self._narrowphase.intersect_pairs(keys_a, keys_b)
+        return [pair for pair, colliding in zip(candidate_pairs,
+                                                mask.tolist())
+                if colliding]
+
+    def _keep_first_hits(self, colliding_pairs):
+        # A swept body only hits the first body or tile along its path, so
+        # that it cannot reach a block behind another one. Ties go to the
+        # lowest collision id, whatever order the broadphase found them in.
+        pairs = []
+        first_hits = {}
+        for pair in colliding_pairs:
+            for body, other_body in pair, pair[::-1]:
+                sweep = self._get_sweep(body)
+                if sweep is not None:
+                    hit = (self._get_hit_fraction(sweep, other_body),
+                           other_body._collision_id)
+                    first_hit = first_hits.get(body)
+                    if first_hit is None or hit < first_hit[0]:
+                        first_hits[body] = hit, pair
+                    break
+            else:
+                pairs.append(pair)
+        pairs.extend(pair for hit, pair in first_hits.itervalues())
+        return pairs
+
+    def _get_sweep(self, body):
+        if isinstance(body, CollisionTile) or len(body._polygon) != 1:
+            return None
+        polygon = body._get_world_polygon()
+        if len(polygon) != 2:
+            return None
+        current_vertex, previous_vertex = polygon
+        return (previous_vertex.x, previous_vertex.y,
+                current_vertex.x, current_vertex.y)
+
+    def _get_hit_fraction(self, sweep, other_body):
+        if isinstance(other_body, CollisionTile):
+            grid_x, grid_y = other_body._grid_position
+            shape = self._tile_map._get_tile_bounds(grid_x, grid_y)
+        else:
+            shape = other_body._get_world_polygon()
+        fraction = shape.intersect_segment(*sweep)
+        # Shapes without area, and sweeps that only graze a shape, are
+        # ordered after every real hit.
+        if fraction is None:
+            return 1.0
+        return fraction
+
+    def _add_collision(self, body, other_body):
+        if body.user_data < other_body.user_data:
+            collision = Collision(body, other_body)
+        else:
+            collision = Collision(other_body, body)
+        self._collisions[collision._key] = collision
+        body._collisions.append(collision)
+        other_body._collisions.append(collision)
+        return collision
+
+    def _remove_collisions(self, collisions):
+        for collision in list(collisions):
+            if self._collisions.get(collision._key) is not collision:
+                continue
+            del self._collisions[collision._key]
+            collision.body_a._collisions.remove(collision)
+            collision.body_b._collisions.remove(collision)
+            if collision._active:
+                collision._active = False
+                if self._listener is not None:
+                    self._listener.on_collision_remove(collision)
 
-            body._update_world_geometry()
-            self._grid.update_body(body)
-
-            for other_body in self._grid.find_collisions(body):
-                if not other_body._dirty and \
-                    body._world_polygon.intersects(other_body._world_polygon):
-                    if body.user_data < other_body.user_data:
-                        collision = Collision(body, other_body)
-                    else:
-                        collision = Collision(other_body, body)
-                    collisions.append(collision)
-        if self._listener is not None:
-            for collision in collisions:
-                self._listener.on_collision_add(collision)
-                self._listener.on_collision_remove(collision)
+    def _generate_key(self, kind):
+        free_keys = self._free_keys[kind]
+        if free_keys:
+            return free_keys.pop()
+        key = self._next_keys[kind]
+        self._next_keys[kind] += 1
+        return key
@@ -0,0 +1,84 @@
+from drillion.collision import (CollisionBody, CollisionDetector,
+                                CollisionGrid, CollisionTile, SweepAndPrune)
+from drillion.maths import Transform2
+from drillion.pnoise import pnoise
+
+import math
+import random
+import time
+
+class CollisionBenchmark(object):
+    def __init__(self, broadphase, grid_size=40, bullet_count=2000, seed=0):
+        self._random = random.Random(seed)
+        self._detector = CollisionDetector(broadphase=broadphase)
+        self._half_size = float(grid_size)
+        self._bullets = []
+
+        seed_x = 1000.0 * self._random.random()
+        seed_y = 1000.0 * self._random.random()
+        seed_z = 1000.0 * self._random.random()
+        noise_scale = 0.15
+
+        for grid_x in xrange(-grid_size // 2, grid_size // 2):
+            for grid_y in xrange(-grid_size // 2, grid_size // 2):
+                noise_x = seed_x + noise_scale * float(grid_x)
+                noise_y = seed_y + noise_scale * float(grid_y)
+                if pnoise(noise_x, noise_y, seed_z) > 0.0:
+                    # Blocks are tiles, like the terrain in the game.
+                    tile = CollisionTile((grid_x, grid_y),
+                                         user_data=('block', None))
+                    self._detector.add_tile(tile)
+
+        for _ in xrange(bullet_count):
+            body = CollisionBody([(0.0, 0.0)], user_data=('bullet', None))
+            x = self._random.uniform(-self._half_size, self._half_size)
+            y = self._random.uniform(-self._half_size, self._half_size)
+            angle = self._random.uniform(0.0, 2.0 * math.pi)
+            speed = self._random.uniform(0.0, 20.0)
+            velocity = speed * math.cos(angle), speed * math.sin(angle)
+            body.transform.assign(*Transform2(c=x, f=y))
+            self._detector.add_body(body)
+            self._bullets.append([body, velocity])
+
+        self._detector.update(0.0)
+
+    def update(self, dt):
+        for bullet in self._bullets:
+            body, (dx, dy) = bullet
+            transform = body.transform
+            transform.c, dx = self._move(transform.c, dx, dt)
+            transform.f, dy = self._move(transform.f, dy, dt)
+            bullet[1] = dx, dy
+            body.touch()
+        self._detector.update(dt)
+
+    def _move(self, position, velocity, dt):
+        # Bullets bounce off the edges of the area. Wrapping them around
+        # would sweep them across the whole area in a single tick.
+        half_size = self._half_size
+        position += dt * velocity
+        if position > half_size:
+            return 2.0 * half_size - position, -velocity
+        if position < -half_size:
+            return -2.0 * half_size - position, -velocity
+        return position, velocity
+
+def run_benchmark(broadphase, tick_count=100, dt=0.1):
+    benchmark = CollisionBenchmark(broadphase)
+    start_time = time.clock()
+    for _ in xrange(tick_count):
+        benchmark.update(dt)
+    end_time = time.clock()
+    return (end_time - start_time) / float(tick_count)
+
+def main():
+    broadphase_factories = [
+        ('grid', lambda: CollisionGrid(2.0)),
+        ('sweep-and-prune', SweepAndPrune),
+    ]
+    for name, factory in broadphase_factories:
+        tick_time = run_benchmark(factory())
+        print '%-16s %.6f s/tick' % (name, tick_time)
+
+if __name__ == '__main__':
+    main()
@@ -19,7 +19,7 @@ class CollisionDispatcher(CollisionListener):
     def _get_key(self, collision):
         category_a, entity_a = collision.body_a.user_data
         category_b, entity_b = collision.body_b.user_data
-        if entity_a.key == -1 or entity_b.key == -1:
+        if not entity_a.alive or not entity_b.alive:
             return None
         else:
             return category_a, category_b
@@ -0,0 +1,13 @@
+from drillion.component import Component
+
+class CollisionTileComponent(Component):
+    def __init__(self, tile, detector):
+        super(CollisionTileComponent, self).__init__()
+        self.tile = tile
+        self.detector = detector
+
+    def create(self):
+        self.detector.add_tile(self.tile)
+
+    def delete(self):
+        self.detector.remove_tile(self.tile)
@@ -1,6 +1,7 @@
 class Component(object):
     def __init__(self):
         self.entity = None
+        self.deleted = False
 
     def create(self):
         pass
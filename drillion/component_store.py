@@ -0,0 +1,88 @@
+from collections import defaultdict
+
+class Archetype(object):
+    def __init__(self, component_types):
+        self.component_types = tuple(component_types)
+        self.entities = []
+        self.columns = [[] for _ in self.component_types]
+
+    def __len__(self):
+        return len(self.entities)
+
+    def add_entity(self, entity):
+        entity._archetype = self
+        entity._archetype_row = len(self.entities)
+        self.entities.append(entity)
+        for column, component in zip(self.columns, entity.components):
+            column.append(component)
+
+    def remove_entity(self, entity):
+        # Move the last row into the gap to keep the columns dense.
+        row = entity._archetype_row
+        last_entity = self.entities.pop()
+        if last_entity is not entity:
+            self.entities[row] = last_entity
+            last_entity._archetype_row = row
+        for column in self.columns:
+            last_component = column.pop()
+            if last_entity is not entity:
+                column[row] = last_component
+        entity._archetype = None
+        entity._archetype_row = -1
+
+class ComponentStore(object):
+    def __init__(self):
+        self._archetypes = {}
+        self._type_columns = defaultdict(list)
+        self._query_cache = {}
+
+    @property
+    def archetypes(self):
+        return self._archetypes.itervalues()
+
+    def add_entity(self, entity):
+        component_types = tuple(type(component)
+                                for component in entity.components)
+        archetype = self._archetypes.get(component_types)
+        if archetype is None:
+            archetype = self._add_archetype(component_types)
+        archetype.add_entity(entity)
+
+    def remove_entity(self, entity):
+        entity._archetype.remove_entity(entity)
+
+    def iter_components(self, cls):
+        for column in self._get_columns(cls):
+            for component in column:
+                yield component
+
+    def count_components(self, cls):
+        return sum(len(column) for column in self._get_columns(cls))
+
+    def _add_archetype(self, component_types):
+        archetype = Archetype(component_types)
+        self._archetypes[component_types] = archetype
+        for component_type, column in zip(component_types, archetype.columns):
+            self._type_columns[component_type].append(column)
+        self._query_cache.clear()
+        return archetype
+
+    def _get_columns(self, cls):
+        columns = self._query_cache.get(cls)
+        if columns is None:
+            columns = [column
+                       for component_type, type_columns
+                       in self._type_columns.iteritems()
+                       if issubclass(component_type, cls)
+                       for column in type_columns]
+            self._query_cache[cls] = columns
+        return columns
+
+class ComponentUpdater(object):
+    def __init__(self, component_store, cls):
+        self._component_store = component_store
+        self._cls = cls
+
+    def update(self, dt):
+        for component in self._component_store.iter_components(self._cls):
+            component.update(dt)
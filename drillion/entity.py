@@ -1,9 +1,28 @@
 class Entity(object):
-    def __init__(self, components=[], parent=None):
-        self.components = list(components)
+    def __init__(self, components=[], parent=None, category=None):
+        # The type index and the component store rely on the components
+        # never changing, so they are kept in a tuple.
+        self._components = tuple(components)
         self.key = -1
+        self.category = category
+        self._destroy_pending = False
         self._parent = parent
         self._children = []
+        self._archetype = None
+        self._archetype_row = -1
+
+        self._components_by_type = {}
+        for component in self._components:
+            for cls in type(component).__mro__:
+                self._components_by_type.setdefault(cls, component)
+
+    @property
+    def components(self):
+        return self._components
+
+    @property
+    def alive(self):
+        return self.key != -1 and not self._destroy_pending
 
     @property
     def parent(self):
@@ -16,6 +35,7 @@ class Entity(object):
     def create(self):
         for component in self.components:
             component.entity = self
+            component.deleted = False
             component.create()
         if self._parent is not None:
             self._parent._children.append(self)
@@ -26,9 +46,7 @@ class Entity(object):
         for component in reversed(self.components):
             component.delete()
             component.entity = None
+            component.deleted = True
 
     def find_component(self, cls):
-        for component in self.components:
-            if isinstance(component, cls):
-                return component
-        return None
+        return self._components_by_type.get(cls)
@@ -1,17 +1,75 @@
+from drillion.component_store import ComponentStore
+
+from collections import defaultdict
+
 class EntityManager(object):
     def __init__(self):
         self._entities = {}
         self._next_key = 0
+        self._component_store = ComponentStore()
+        self._category_counts = defaultdict(int)
+        self._destroy_queue = []
+        self._batch_handlers = []
+
+    @property
+    def component_store(self):
+        return self._component_store
+
+    @property
+    def category_counts(self):
+        return dict(self._category_counts)
+
+    def get_count(self, category):
+        return self._category_counts.get(category, 0)
+
+    def add_batch_handler(self, handler):
+        self._batch_handlers.append(handler)
+
+    def remove_batch_handler(self, handler):
+        self._batch_handlers.remove(handler)
+
+    def iter_components(self, cls):
+        return self._component_store.iter_components(cls)
 
     def add_entity(self, entity):
         entity.key = self._generate_key()
         self._entities[entity.key] = entity
+        self._component_store.add_entity(entity)
+        self._category_counts[entity.category] += 1
         entity.create()
 
+    def destroy_entity(self, entity):
+        if entity.alive:
+            entity._destroy_pending = True
+            self._destroy_queue.append(entity)
+
+    def update(self, dt):
+        self.flush()
+
+    def flush(self):
+        if not self._destroy_queue:
+            return
+
+        # Batch handlers defer their per-removal bookkeeping until every
+        # queued entity has been removed.
+        for handler in self._batch_handlers:
+            handler.begin_batch()
+        while self._destroy_queue:
+            destroy_queue = self._destroy_queue
+            self._destroy_queue = []
+            for entity in destroy_queue:
+                if entity._destroy_pending:
+                    self.remove_entity(entity)
+        for handler in reversed(self._batch_handlers):
+            handler.end_batch()
+
     def remove_entity(self, entity):
+        entity._destroy_pending = False
         for child in reversed(list(entity.children)):
             self.remove_entity(child)
         entity.delete()
+        self._component_store.remove_entity(entity)
+        self._category_counts[entity.category] -= 1
         del self._entities[entity.key]
         entity.key = -1
 
@@ -1,5 +1,5 @@
 from drillion.bitmap_text import BitmapFont, BitmapFontConfig, BitmapLabel
-from drillion.maths import cf2ub, clamp, mix
+from drillion.maths import cf2ub, clamp, mix, Transform2
 from drillion.shader import Shader
 
 from math import cos, pi, sin
@@ -8,7 +8,7 @@ from pyglet.window import key
 from pyglet.gl import *
 
 class Game(pyglet.window.Window):
-    def __init__(self, update_phases=[], draw_phases=[]):
+    def __init__(self, update_phases=[], draw_phases=[], profiler=None):
         config = pyglet.gl.Config(double_buffer=1, sample_buffers=1,samples=16)
         super(Game, self).__init__(fullscreen=True, config=config)
         self.max_dt = 1.0
@@ -20,6 +20,7 @@ class Game(pyglet.window.Window):
         self.update_phases = list(update_phases)
         self.draw_phases = list(draw_phases)
         self.key_state_handler = pyglet.window.key.KeyStateHandler()
+        self.profiler = profiler
 
         frag_shader_source = """
         uniform sampler2D tex;
@@ -60,6 +61,8 @@ class Game(pyglet.window.Window):
         self.key_state_handler.on_key_release(symbol, modifiers)
 
     def update(self, dt):
+        if self.profiler is not None:
+            self.profiler.begin_frame()
         dt = min(dt, self.max_dt)
         self.time += dt
         while self.time > self.world_time + self.world_dt:
@@ -79,6 +82,8 @@ class Game(pyglet.window.Window):
         self.draw_hud(alpha)
 
         self.draw_count += 1
+        if self.profiler is not None:
+            self.profiler.end_frame()
 
     def draw_world(self, alpha):
         aspect_ratio = float(self.width) / float(self.height)
@@ -107,8 +112,7 @@ class Game(pyglet.window.Window):
         label_alpha_angle = clamp(2.0 * pi * (label_time - 5.0) / 5.0, 0.0, 2.0 * pi)
         label_alpha = 0.5 * (1.0 + sin(label_alpha_angle - 0.5 * pi))
 
-        label_transform = self.label.transform
-        label_transform.reset()
+        label_transform = Transform2()
         label_transform.scale(label_scale, label_scale)
         label_transform.rotate(label_angle)
         label_transform.translate(0.5 * float(self.width),
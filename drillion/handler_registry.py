@@ -0,0 +1,63 @@
+class HandlerRegistry(object):
+    def __init__(self):
+        self._handlers = []
+        self._indices = {}
+        self._removed_count = 0
+        self._iteration_depth = 0
+        self._batch_depth = 0
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __contains__(self, handler):
+        return handler in self._indices
+
+    def __iter__(self):
+        # Removed handlers leave a None behind until the next compaction, so
+        # handlers can be added and removed while the registry is iterated.
+        # Handlers added during iteration are first visited on the next pass.
+        self._iteration_depth += 1
+        try:
+            handlers = self._handlers
+            for index in xrange(len(handlers)):
+                handler = handlers[index]
+                if handler is not None:
+                    yield handler
+        finally:
+            self._iteration_depth -= 1
+            self._compact_if_needed()
+
+    def add(self, handler):
+        if handler in self._indices:
+            raise ValueError('Handler is already registered')
+        self._indices[handler] = len(self._handlers)
+        self._handlers.append(handler)
+
+    def remove(self, handler):
+        index = self._indices.pop(handler, None)
+        if index is None:
+            raise ValueError('Handler is not registered')
+        self._handlers[index] = None
+        self._removed_count += 1
+        self._compact_if_needed()
+
+    def begin_batch(self):
+        self._batch_depth += 1
+
+    def end_batch(self):
+        self._batch_depth -= 1
+        self._compact_if_needed()
+
+    def find_dead_handlers(self):
+        # Components of deleted entities should have removed themselves.
+        return [handler for handler in self._handlers
+                if getattr(handler, 'deleted', False)]
+
+    def _compact_if_needed(self):
+        if (self._iteration_depth == 0 and self._batch_depth == 0 and
+                2 * self._removed_count > len(self._handlers)):
+            self._handlers = [handler for handler in self._handlers
+                              if handler is not None]
+            for index, handler in enumerate(self._handlers):
+                self._indices[handler] = index
+            self._removed_count = 0
@@ -0,0 +1,167 @@
+import pyglet
+
+# The headless runner never opens a window, so keep pyglet from creating its
+# hidden shadow window when the sprite modules import pyglet.gl.
+pyglet.options['shadow_window'] = False
+
+from drillion.health_component import HealthComponent
+from drillion.profiler import clock, Profiler
+from drillion.ship_keys import PLAYER_1_SHIP_KEYS, PLAYER_2_SHIP_KEYS
+from drillion.world import World
+
+from pyglet.window.key import KeyStateHandler
+import argparse
+import math
+import random
+
+WORLD_DT = 0.1
+
+class Scenario(object):
+    name = None
+    description = None
+    tick_count = 100
+    bullet_capacity = 256
+
+    def setup(self, world, key_state_handler):
+        pass
+
+    def update(self, world, key_state_handler, tick):
+        pass
+
+class DuelScenario(Scenario):
+    name = 'duel'
+    description = '2 ships firing for 60 s'
+    tick_count = int(round(60.0 / WORLD_DT))
+
+    def setup(self, world, key_state_handler):
+        world.generate_terrain()
+        world.create_ship(position=(-2.0, 0.0), angle=(0.5 * math.pi),
+                          keys=PLAYER_1_SHIP_KEYS)
+        world.create_ship(position=(2.0, 0.0), angle=(0.5 * math.pi),
+                          keys=PLAYER_2_SHIP_KEYS)
+
+    def update(self, world, key_state_handler, tick):
+        # Both ships keep firing and sweep back and forth in place.
+        turning_left = tick // 25 % 2 == 0
+        for keys in PLAYER_1_SHIP_KEYS, PLAYER_2_SHIP_KEYS:
+            key_state_handler[keys['fire'][0]] = True
+            key_state_handler[keys['left'][0]] = turning_left
+            key_state_handler[keys['right'][0]] = not turning_left
+
+class BulletStormScenario(Scenario):
+    name = 'bullet-storm'
+    description = '10k bullets vs 40x40 terrain'
+    bullet_capacity = 10000
+
+    def setup(self, world, key_state_handler):
+        world.generate_terrain(grid_size=40)
+
+        # Bullets still hit and damage the blocks, but never destroy them,
+        # so every tick runs against the same terrain.
+        for chunk in world.terrain_system.chunks.itervalues():
+            for block_entity in chunk.block_entities.itervalues():
+                health_component = block_entity.find_component(HealthComponent)
+                health_component.min_health = float('-inf')
+
+    def update(self, world, key_state_handler, tick):
+        # Replace the bullets that were destroyed or expired since last tick.
+        bullet_pool = world.bullet_pool
+        for _ in xrange(bullet_pool.capacity - bullet_pool.active_count):
+            position = random.uniform(-40.0, 40.0), random.uniform(-40.0, 40.0)
+            angle = random.uniform(0.0, 2.0 * math.pi)
+            speed = random.uniform(0.0, 20.0)
+            velocity = speed * math.cos(angle), speed * math.sin(angle)
+            bullet_pool.spawn(position=position, velocity=velocity)
+
+SCENARIOS = dict((scenario.name, scenario)
+                 for scenario in [DuelScenario, BulletStormScenario])
+
+class HeadlessResult(object):
+    def __init__(self, scenario, tick_count, total_time, phase_times,
+                 category_counts, profiler):
+        self.scenario = scenario
+        self.tick_count = tick_count
+        self.total_time = total_time
+        self.phase_times = phase_times
+        self.category_counts = category_counts
+        self.profiler = profiler
+
+    @property
+    def ticks_per_second(self):
+        return self.tick_count / max(self.total_time, 1e-9)
+
+    def get_report(self):
+        lines = ['Scenario: %s (%s)' % (self.scenario.name,
+                                        self.scenario.description),
+                 'Ticks: %d' % self.tick_count,
+                 'Ticks per second: %f' % self.ticks_per_second]
+        total_phase_time = max(sum(time for time, name in self.phase_times),
+                               1e-9)
+        for time, name in reversed(sorted(self.phase_times)):
+            time_percentage = int(round(100.0 * time / total_phase_time))
+            lines.append('%3d%%  %f  %s' % (time_percentage, time, name))
+        lines.append('Live entities:')
+        for category, count in sorted(self.category_counts.items()):
+            if count:
+                lines.append('%6d  %s' % (count, category))
+        if self.profiler is not None and self.profiler.enabled:
+            lines.append(self.profiler.get_report())
+        return '\n'.join(lines)
+
+def run_scenario(scenario, tick_count=None, seed=0, profiler=None):
+    if tick_count is None:
+        tick_count = scenario.tick_count
+    random.seed(seed)
+    key_state_handler = KeyStateHandler()
+    world = World(key_state_handler=key_state_handler, profiler=profiler,
+                  bullet_capacity=scenario.bullet_capacity)
+    scenario.setup(world, key_state_handler)
+
+    start_time = clock()
+    for tick in xrange(tick_count):
+        if profiler is not None:
+            profiler.begin_frame()
+        scenario.update(world, key_state_handler, tick)
+        world.update(WORLD_DT)
+        if profiler is not None:
+            profiler.end_frame()
+    end_time = clock()
+
+    phase_times = [(phase.total_time, phase.name)
+                   for phase in world.update_phases]
+    return HeadlessResult(scenario, tick_count, end_time - start_time,
+                          phase_times, world.entity_manager.category_counts,
+                          profiler)
+
+def main():
+    parser = argparse.ArgumentParser(description='Run Drillion without a '
+                                     'window and report its performance.')
+    parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                        help='scenarios to run (default: all): %s' %
+                        ', '.join(sorted(SCENARIOS)))
+    parser.add_argument('--ticks', type=int,
+                        help='number of ticks instead of the scenario default')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile', action='store_true',
+                        help='report per-handler times and frame percentiles')
+    parser.add_argument('--trace', metavar='PREFIX',
+                        help='write a Chrome trace-event file per scenario '
+                        'to PREFIX-SCENARIO.json')
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error('unknown scenario: %s' % name)
+
+    for name in args.scenarios or sorted(SCENARIOS):
+        profiler = None
+        if args.profile or args.trace:
+            profiler = Profiler()
+        result = run_scenario(SCENARIOS[name](), tick_count=args.ticks,
+                              seed=args.seed, profiler=profiler)
+        print result.get_report()
+        print
+        if args.trace:
+            profiler.dump_chrome_trace('%s-%s.json' % (args.trace, name))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+from drillion.component import Component
+
+class LifetimeComponent(Component):
+    def __init__(self, transform_component, lifetime_system, lifetime=None,
+                 on_expire=None):
+        super(LifetimeComponent, self).__init__()
+        self.transform_component = transform_component
+        self.lifetime_system = lifetime_system
+        self.lifetime = lifetime
+        self.on_expire = on_expire
+
+        self._lifetime_index = -1
+        self._lifetime_token = 0
+        self._expire_time = None
+
+    @property
+    def remaining_lifetime(self):
+        if self._expire_time is None:
+            return None
+        return self._expire_time - self.lifetime_system.time
+
+    def create(self):
+        self.lifetime_system.add_component(self)
+
+    def delete(self):
+        self.lifetime_system.remove_component(self)
@@ -0,0 +1,79 @@
+import heapq
+
+class LifetimeSystem(object):
+    def __init__(self, entity_manager, world_bounds=None):
+        self._entity_manager = entity_manager
+        self._world_bounds = world_bounds
+        self._components = []
+        self._expire_queue = []
+        self._time = 0.0
+        self._next_token = 1
+        self._expired_count = 0
+
+    @property
+    def time(self):
+        return self._time
+
+    @property
+    def expired_count(self):
+        return self._expired_count
+
+    @property
+    def world_bounds(self):
+        return self._world_bounds
+
+    @world_bounds.setter
+    def world_bounds(self, world_bounds):
+        self._world_bounds = world_bounds
+
+    def add_component(self, component):
+        component._lifetime_index = len(self._components)
+        component._lifetime_token = self._next_token
+        self._next_token += 1
+        self._components.append(component)
+        if component.lifetime is not None:
+            expire_time = self._time + component.lifetime
+            component._expire_time = expire_time
+            heapq.heappush(self._expire_queue,
+                           (expire_time, component._lifetime_token, component))
+
+    def remove_component(self, component):
+        # Queued expiry entries are left behind and skipped once their token
+        # no longer matches.
+        index = component._lifetime_index
+        last_component = self._components.pop()
+        if last_component is not component:
+            self._components[index] = last_component
+            last_component._lifetime_index = index
+        component._lifetime_index = -1
+        component._lifetime_token = 0
+        component._expire_time = None
+
+    def update(self, dt):
+        self._time += dt
+        expired_components = []
+
+        queue = self._expire_queue
+        while queue and queue[0][0] <= self._time:
+            expire_time, token, component = heapq.heappop(queue)
+            if component._lifetime_token == token:
+                expired_components.append(component)
+
+        if self._world_bounds is not None:
+            x1, y1 = self._world_bounds.p1
+            x2, y2 = self._world_bounds.p2
+            for component in self._components:
+                transform = component.transform_component.transform
+                if not (x1 <= transform.c <= x2 and y1 <= transform.f <= y2):
+                    expired_components.append(component)
+
+        for component in expired_components:
+            # A component can be both out of bounds and out of time.
+            entity = component.entity
+            if component._lifetime_index == -1 or not entity.alive:
+                continue
+            if component.on_expire is not None:
+                component.on_expire(entity)
+            else:
+                self._entity_manager.destroy_entity(entity)
+            self._expired_count += 1
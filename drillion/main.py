@@ -1,152 +1,68 @@
-from drillion.block_entity_creator import BlockEntityCreator
-from drillion.block_bullet_collision_handler import BlockBulletCollisionHandler
-from drillion.block_ship_collision_handler import BlockShipCollisionHandler
-from drillion.bullet_entity_creator import BulletEntityCreator
-from drillion.cannon_entity_creator import CannonEntityCreator
-from drillion.collision import CollisionDetector
-from drillion.collision_dispatcher import CollisionDispatcher
-from drillion.draw_phase import DrawPhase
-from drillion.entity_manager import EntityManager
 from drillion.game import Game
-from drillion.pnoise import pnoise
+from drillion.profiler import Profiler
+from drillion.save_game import save_world, SaveFile
 from drillion.ship_keys import PLAYER_1_SHIP_KEYS, PLAYER_2_SHIP_KEYS
-from drillion.ship_entity_creator import ShipEntityCreator
-from drillion.update_phase import UpdatePhase
+from drillion.world import World
 
 import pyglet
 from pyglet.window import key
 from pyglet.gl import *
 import math
-import random
+import os
+
+PLAYER_1_CANNONS = [
+    ((-0.5, 0.5), 0.0 * math.pi, 1.5, 0.125),
+    ((-0.5, 0.25), 0.0 * math.pi, 1.75, 0.125),
+    ((-0.5, -0.25), 0.0 * math.pi, 1.75, 0.125),
+    ((-0.5, -0.5), 0.0 * math.pi, 1.5, 0.125),
+]
+PLAYER_2_CANNONS = [
+    ((-0.5, 0.25), 0.0 * math.pi, 1.75, 0.125),
+    ((-0.5, 0.0), 0.0 * math.pi, 2.0, 0.125),
+    ((-0.5, -0.25), 0.0 * math.pi, 1.75, 0.125),
+]
 
 def main():
     pyglet.resource.path.append('../data')
     pyglet.resource.reindex()
 
-    input_update_phase = UpdatePhase('input')
-    control_update_phase = UpdatePhase('control')
-    physics_update_phase = UpdatePhase('physics')
-    collision_transform_update_phase = UpdatePhase('collision_transform')
-    collision_update_phase = UpdatePhase('collision')
-    health_update_phase = UpdatePhase('health')
-    animation_update_phase = UpdatePhase('animation')
-
-    entity_manager = EntityManager()
-
-    block_bullet_collision_handler = BlockBulletCollisionHandler(entity_manager)
-    block_ship_collision_handler = BlockShipCollisionHandler(entity_manager)
-    collision_handlers = {
-        ('block', 'bullet'): block_bullet_collision_handler,
-        ('block', 'ship'): block_ship_collision_handler,
-    }
-    collision_dispatcher = CollisionDispatcher(collision_handlers)
-
-    collision_detector = CollisionDetector(listener=collision_dispatcher)
-    collision_update_phase.add_handler(collision_detector)
-
-    draw_phase = DrawPhase('draw')
-
-    update_phases = [
-        input_update_phase,
-        control_update_phase,
-        physics_update_phase,
-        collision_transform_update_phase,
-        collision_update_phase,
-        health_update_phase,
-        animation_update_phase,
-    ]
-    draw_phases = [draw_phase]
-    game = Game(update_phases, draw_phases)
-
-    block_entity_creator = BlockEntityCreator(health_update_phase,
-                                              collision_detector, game.batch)
-    bullet_entity_creator = \
-        BulletEntityCreator(physics_update_phase,
-                            collision_transform_update_phase,
-                            animation_update_phase, draw_phase,
-                            collision_detector, game.batch)
-    ship_entity_creator = ShipEntityCreator(input_update_phase,
-                                            control_update_phase,
-                                            physics_update_phase,
-                                            collision_transform_update_phase,
-                                            animation_update_phase,
-                                            draw_phase, game.key_state_handler,
-                                            collision_detector, game.batch,
-                                            bullet_entity_creator,
-                                            entity_manager)
-    cannon_entity_creator = CannonEntityCreator(animation_update_phase,
-                                                draw_phase, game.batch)
-
-    seed_x = 1000.0 * random.random()
-    seed_y = 1000.0 * random.random()
-    seed_z = 1000.0 * random.random()
-
-    noise_scale = 0.15
-
-    for grid_x in xrange(-20, 20):
-        for grid_y in xrange(-20, 20):
-            if -2 <= grid_x < 2 and -1 <= grid_y < 1:
-                continue
-            noise_x = seed_x + noise_scale * float(grid_x)
-            noise_y = seed_y + noise_scale * float(grid_y)
-            noise_z = seed_z
-            density = pnoise(noise_x, noise_y, noise_z)
-            if density > 0.0:
-                block_entity = block_entity_creator.create(grid_position=(grid_x, grid_y))
-                entity_manager.add_entity(block_entity)
-
-    ship_entity_1 = ship_entity_creator.create(position=(-2.0, 0.0),
-                                               angle=(0.5 * math.pi),
-                                               keys=PLAYER_1_SHIP_KEYS)
-    entity_manager.add_entity(ship_entity_1)
-
-    cannon_entity_1_1 = cannon_entity_creator.create(ship_entity_1,
-                                                     position=(-0.5, 0.5),
-                                                     angle=(0.0 * math.pi),
-                                                     length=1.5, width=0.125)
-    cannon_entity_1_2 = cannon_entity_creator.create(ship_entity_1,
-                                                     position=(-0.5, 0.25),
-                                                     angle=(0.0 * math.pi),
-                                                     length=1.75, width=0.125)
-    cannon_entity_1_3 = cannon_entity_creator.create(ship_entity_1,
-                                                     position=(-0.5, -0.25),
-                                                     angle=(0.0 * math.pi),
-                                                     length=1.75, width=0.125)
-    cannon_entity_1_4 = cannon_entity_creator.create(ship_entity_1,
-                                                     position=(-0.5, -0.5),
-                                                     angle=(0.0 * math.pi),
-                                                     length=1.5, width=0.125)
-    entity_manager.add_entity(cannon_entity_1_1)
-    entity_manager.add_entity(cannon_entity_1_2)
-    entity_manager.add_entity(cannon_entity_1_3)
-    entity_manager.add_entity(cannon_entity_1_4)
-
-    ship_entity_2 = ship_entity_creator.create(position=(2.0, 0.0),
-                                               angle=(0.5 * math.pi),
-                                               keys=PLAYER_2_SHIP_KEYS)
-    entity_manager.add_entity(ship_entity_2)
-
-    cannon_entity_2_1 = cannon_entity_creator.create(ship_entity_2,
-                                                     position=(-0.5, 0.25),
-                                                     angle=(0.0 * math.pi),
-                                                     length=1.75, width=0.125)
-    cannon_entity_2_2 = cannon_entity_creator.create(ship_entity_2,
-                                                     position=(-0.5, 0.0),
-                                                     angle=(0.0 * math.pi),
-                                                     length=2.0, width=0.125)
-    cannon_entity_2_3 = cannon_entity_creator.create(ship_entity_2,
-                                                     position=(-0.5, -0.25),
-                                                     angle=(0.0 * math.pi),
-                                                     length=1.75, width=0.125)
-    entity_manager.add_entity(cannon_entity_2_1)
-    entity_manager.add_entity(cannon_entity_2_2)
-    entity_manager.add_entity(cannon_entity_2_3)
+    trace_path = os.environ.get('DRILLION_TRACE')
+    profiler = Profiler(enabled=bool(os.environ.get('DRILLION_PROFILE') or
+                                     trace_path))
+
+    load_path = os.environ.get('DRILLION_LOAD')
+    save_path = os.environ.get('DRILLION_SAVE')
+    save_file = None
+    world_options = {}
+    if load_path:
+        save_file = SaveFile(load_path)
+        world_options = dict(chunk_size=save_file.chunk_size,
+                             terrain_seed=save_file.terrain_seed)
+
+    game = Game(profiler=profiler)
+    world = World(game.batch, game.key_state_handler, profiler,
+                  terrain_processes=1, install_budget=0.002, **world_options)
+    game.update_phases = world.update_phases
+    game.draw_phases = world.draw_phases
+
+    world.create_ship(position=(-2.0, 0.0), angle=(0.5 * math.pi),
+                      keys=PLAYER_1_SHIP_KEYS, cannons=PLAYER_1_CANNONS)
+    world.create_ship(position=(2.0, 0.0), angle=(0.5 * math.pi),
+                      keys=PLAYER_2_SHIP_KEYS, cannons=PLAYER_2_CANNONS)
+    if save_file is not None:
+        save_file.restore(world)
 
     pyglet.clock.schedule(game.update)
     pyglet.app.run()
 
+    if save_path:
+        save_world(world, save_path)
+    world.close()
+    if save_file is not None:
+        save_file.close()
+
     update_phase_times = [(phase.total_time, phase.name)
-                          for phase in update_phases]
+                          for phase in world.update_phases]
     total_update_time = sum(time for time, name in update_phase_times)
     average_update_time = total_update_time / float(game.update_count)
     print 'Average update time: %f' % average_update_time
@@ -155,10 +71,30 @@ def main():
         print '%3d%%  %s' % (time_percentage, name)
 
     draw_phase_times = [(phase.total_time, phase.name)
-                        for phase in draw_phases]
+                        for phase in world.draw_phases]
     total_draw_time = sum(time for time, name in draw_phase_times)
     average_draw_time = total_draw_time / float(game.draw_count)
     print 'Average draw time: %f' % average_draw_time
 
+    dead_handler_counts = [(len(phase.find_dead_handlers()), phase.name)
+                           for phase in world.update_phases +
+                           world.draw_phases]
+    dead_handler_counts.append((len(world.physics_system.find_dead_handlers()),
+                                'physics_system'))
+    for count, name in dead_handler_counts:
+        if count:
+            print 'Dead handlers in %s: %d' % (name, count)
+
+    if profiler.enabled:
+        print profiler.get_report()
+        if trace_path:
+            profiler.dump_chrome_trace(trace_path)
+
+    print 'Live entities:'
+    for category, count in \
+            sorted(world.entity_manager.category_counts.items()):
+        if count:
+            print '%6d  %s' % (count, category)
+
 if __name__ == '__main__':
     main()
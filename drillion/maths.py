@@ -1,5 +1,10 @@
 import math
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 def sign(x):
     return -1.0 if x < 0.0 else 1.0
 
@@ -196,6 +201,25 @@ class Box2(object):
     def contains_point(self, x, y):
         return self.p1.x < x < self.p2.x and self.p1.y < y < self.p2.y
 
+    def intersect_segment(self, x1, y1, x2, y2):
+        enter_fraction = 0.0
+        exit_fraction = 1.0
+        for start, delta, low, high in ((x1, x2 - x1, self.p1.x, self.p2.x),
+                                        (y1, y2 - y1, self.p1.y, self.p2.y)):
+            if delta == 0.0:
+                if not low < start < high:
+                    return None
+            else:
+                low_fraction = (low - start) / delta
+                high_fraction = (high - start) / delta
+                enter_fraction = max(enter_fraction,
+                                     min(low_fraction, high_fraction))
+                exit_fraction = min(exit_fraction,
+                                    max(low_fraction, high_fraction))
+                if enter_fraction >= exit_fraction:
+                    return None
+        return enter_fraction
+
     def __str__(self):
         return '[%s, %s]', (self.p1, self.p2)
 
@@ -229,6 +253,17 @@ class Polygon2(object):
         return (not self._separates_polygon(other) and
                 not other._separates_polygon(self))
 
+    def intersects_box(self, box):
+        x1, y1 = box.p1
+        x2, y2 = box.p2
+        xs = [vertex.x for vertex in self.vertices]
+        ys = [vertex.y for vertex in self.vertices]
+        if not (min(xs) < x2 and x1 < max(xs) and
+                min(ys) < y2 and y1 < max(ys)):
+            return False
+        corners = [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
+        return not self._separates_polygon(corners)
+
     def _separates_polygon(self, polygon):
         return any(self._edge_separates_polygon(x1, y1, x2, y2, polygon)
                    for (x1, y1), (x2, y2) in self.edges)
@@ -243,7 +278,90 @@ class Polygon2(object):
         return all(self._edge_contains_point(p1.x, p1.y, p2.x, p2.y, x, y)
                    for p1, p2 in self.edges)
 
+    def intersect_segment(self, x1, y1, x2, y2):
+        # Clip the segment against each edge. Points, segments and other
+        # polygons without area are never hit.
+        if len(self.vertices) < 3:
+            return None
+        dx = x2 - x1
+        dy = y2 - y1
+        enter_fraction = 0.0
+        exit_fraction = 1.0
+        for (edge_x1, edge_y1), (edge_x2, edge_y2) in self.edges:
+            edge_dx = edge_x2 - edge_x1
+            edge_dy = edge_y2 - edge_y1
+            numerator = cross_2(x1 - edge_x1, y1 - edge_y1, edge_dx, edge_dy)
+            denominator = cross_2(dx, dy, edge_dx, edge_dy)
+            if denominator == 0.0:
+                if numerator >= 0.0:
+                    return None
+            elif denominator < 0.0:
+                enter_fraction = max(enter_fraction, -numerator / denominator)
+            else:
+                exit_fraction = min(exit_fraction, -numerator / denominator)
+            if enter_fraction >= exit_fraction:
+                return None
+        return enter_fraction
+
     def _edge_contains_point(self, edge_x1, edge_y1, edge_x2, edge_y2,
                              point_x, point_y):
         return (cross_2(point_x - edge_x1, point_y - edge_y1,
                         edge_x2 - edge_x1, edge_y2 - edge_y1) < 0.0)
+
+# The batch functions below take polygons as arrays of shape (n, m, 2) with a
+# vertex count per polygon. Rows with fewer than m vertices are padded with
+# their first vertex, so that edge i always runs from vertex i to vertex
+# i + 1 and edges at or past the vertex count are ignored. They match
+# Polygon2.intersects_polygon and Polygon2.contains_point for each row.
+
+def intersect_convex_polygons(vertices_a, counts_a, vertices_b, counts_b):
+    vertices_a = numpy.asarray(vertices_a, dtype=float)
+    vertices_b = numpy.asarray(vertices_b, dtype=float)
+    counts_a = numpy.asarray(counts_a)
+    counts_b = numpy.asarray(counts_b)
+    result = numpy.empty(len(counts_a), dtype=bool)
+
+    # Single-point bodies reduce to a point-in-polygon test.
+    point_b_mask = counts_b == 1
+    point_a_mask = (counts_a == 1) & ~point_b_mask
+    general_mask = ~(point_a_mask | point_b_mask)
+    if point_b_mask.any():
+        result[point_b_mask] = convex_polygons_contain_points(
+            vertices_a[point_b_mask], counts_a[point_b_mask],
+            vertices_b[point_b_mask, 0])
+    if point_a_mask.any():
+        result[point_a_mask] = convex_polygons_contain_points(
+            vertices_b[point_a_mask], counts_b[point_a_mask],
+            vertices_a[point_a_mask, 0])
+    if general_mask.any():
+        a = vertices_a[general_mask]
+        b = vertices_b[general_mask]
+        result[general_mask] = (
+            ~_convex_polygons_separate(a, counts_a[general_mask], b) &
+            ~_convex_polygons_separate(b, counts_b[general_mask], a))
+    return result
+
+def convex_polygons_contain_points(vertices, counts, points):
+    vertices = numpy.asarray(vertices, dtype=float)
+    points = numpy.asarray(points, dtype=float)
+    edge_starts, edges, valid_edges = _get_convex_polygon_edges(vertices,
+                                                                counts)
+    crosses = ((points[:, None, 0] - edge_starts[:, :, 0]) * edges[:, :, 1] -
+               (points[:, None, 1] - edge_starts[:, :, 1]) * edges[:, :, 0])
+    return ((crosses < 0.0) | ~valid_edges).all(axis=1)
+
+def _convex_polygons_separate(vertices, counts, other_vertices):
+    edge_starts, edges, valid_edges = _get_convex_polygon_edges(vertices,
+                                                                counts)
+    crosses = ((other_vertices[:, None, :, 0] - edge_starts[:, :, None, 0]) *
+               edges[:, :, None, 1] -
+               (other_vertices[:, None, :, 1] - edge_starts[:, :, None, 1]) *
+               edges[:, :, None, 0])
+    return (valid_edges & ~(crosses < 0.0).any(axis=2)).any(axis=1)
+
+def _get_convex_polygon_edges(vertices, counts):
+    edges = numpy.roll(vertices, -1, axis=1) - vertices
+    valid_edges = (numpy.arange(vertices.shape[1])[None, :] <
+                   numpy.asarray(counts)[:, None])
+    valid_edges &= numpy.asarray(counts)[:, None] >= 2
+    return vertices, edges, valid_edges
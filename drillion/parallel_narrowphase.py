@@ -0,0 +1,65 @@
+from drillion.maths import intersect_convex_polygons
+
+import multiprocessing
+import numpy
+
+_world_vertices = None
+_world_vertex_counts = None
+
+def _init_worker(vertex_buffer, count_buffer, max_vertex_count):
+    global _world_vertices, _world_vertex_counts
+    _world_vertices = numpy.frombuffer(vertex_buffer, dtype=numpy.float64)
+    _world_vertices = _world_vertices.reshape(-1, max_vertex_count, 2)
+    _world_vertex_counts = numpy.frombuffer(count_buffer, dtype=numpy.int32)
+
+def _intersect_chunk(chunk):
+    keys_a, keys_b = chunk
+    return intersect_convex_polygons(_world_vertices[keys_a],
+                                     _world_vertex_counts[keys_a],
+                                     _world_vertices[keys_b],
+                                     _world_vertex_counts[keys_b])
+
+class ParallelNarrowphase(object):
+    def __init__(self, arrays, processes=None, chunk_size=4096):
+        if not arrays.shared:
+            raise ValueError('Parallel narrowphase requires shared arrays')
+        self._arrays = arrays
+        self._processes = processes
+        self._chunk_size = chunk_size
+        self._pool = None
+        self._generation = -1
+
+    def intersect_pairs(self, keys_a, keys_b):
+        # Small batches are cheaper to test inline than to ship to workers.
+        if len(keys_a) < 2 * self._chunk_size:
+            return self._arrays.intersect_pairs(keys_a, keys_b)
+        keys_a = numpy.asarray(keys_a, dtype=numpy.intp)
+        keys_b = numpy.asarray(keys_b, dtype=numpy.intp)
+        chunks = [(keys_a[i:i + self._chunk_size],
+                   keys_b[i:i + self._chunk_size])
+                  for i in xrange(0, len(keys_a), self._chunk_size)]
+
+        # Pool.map returns the chunks in order, so listener callbacks run
+        # in the same order as with the inline narrowphase.
+        return numpy.concatenate(self._get_pool().map(_intersect_chunk,
+                                                      chunks))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _get_pool(self):
+        # Workers map the shared buffers when they start, so they have to
+        # be restarted whenever the arrays store reallocates them.
+        if self._generation != self._arrays.generation:
+            self.close()
+            vertex_buffer, count_buffer = self._arrays.shared_buffers
+            initargs = (vertex_buffer, count_buffer,
+                        self._arrays.max_vertex_count)
+            self._pool = multiprocessing.Pool(self._processes,
+                                              initializer=_init_worker,
+                                              initargs=initargs)
+            self._generation = self._arrays.generation
+        return self._pool
@@ -3,7 +3,39 @@ from drillion.maths import clamp, sign, Transform2, Vector2
 
 from math import pi, sqrt
 
+class _PhysicsAttribute(object):
+    def __init__(self, name):
+        self._name = name
+        self._private_name = '_' + name
+
+    def __get__(self, component, cls):
+        if component is None:
+            return self
+        if component._physics_system is not None:
+            return component._physics_system.get_attribute(
+                component._physics_row, self._name)
+        return getattr(component, self._private_name)
+
+    def __set__(self, component, value):
+        if component._physics_system is not None:
+            component._physics_system.set_attribute(component._physics_row,
+                                                    self._name, value)
+        else:
+            setattr(component, self._private_name, value)
+
 class PhysicsComponent(Component):
+    position = _PhysicsAttribute('position')
+    velocity = _PhysicsAttribute('velocity')
+    acceleration = _PhysicsAttribute('acceleration')
+    max_velocity = _PhysicsAttribute('max_velocity')
+    friction = _PhysicsAttribute('friction')
+
+    angle = _PhysicsAttribute('angle')
+    angular_velocity = _PhysicsAttribute('angular_velocity')
+    angular_acceleration = _PhysicsAttribute('angular_acceleration')
+    max_angular_velocity = _PhysicsAttribute('max_angular_velocity')
+    angular_friction = _PhysicsAttribute('angular_friction')
+
     def __init__(self, transform_component, update_phase, position=(0.0, 0.0),
                  velocity=(0.0, 0.0), acceleration=(0.0, 0.0),
                  max_velocity=1.0, friction=0.0, angle=0.0,
@@ -11,6 +43,10 @@ class PhysicsComponent(Component):
                  max_angular_velocity=(2.0 * pi), angular_friction=0.0):
         super(PhysicsComponent, self).__init__()
 
+        # Set when the update phase is a PhysicsSystem that owns the state.
+        self._physics_system = None
+        self._physics_row = -1
+
         self.position = tuple(position)
         self.velocity = tuple(velocity)
         self.acceleration = tuple(acceleration)
@@ -33,7 +69,18 @@ class PhysicsComponent(Component):
         self.update_phase.add_handler(self)
 
     def delete(self):
-        self.update_phase.add_handler(self)
+        self.update_phase.remove_handler(self)
+
+    def reset(self, position=(0.0, 0.0), velocity=(0.0, 0.0),
+              acceleration=(0.0, 0.0), angle=0.0, angular_velocity=0.0,
+              angular_acceleration=0.0):
+        self.position = tuple(position)
+        self.velocity = tuple(velocity)
+        self.acceleration = tuple(acceleration)
+        self.angle = angle
+        self.angular_velocity = angular_velocity
+        self.angular_acceleration = angular_acceleration
+        self._update_transform()
 
     def update(self, dt):
         x, y = self.position
@@ -0,0 +1,129 @@
+import numpy
+
+PHYSICS_ATTRIBUTES = [
+    ('position', 2),
+    ('velocity', 2),
+    ('acceleration', 2),
+    ('max_velocity', 1),
+    ('friction', 1),
+    ('angle', 1),
+    ('angular_velocity', 1),
+    ('angular_acceleration', 1),
+    ('max_angular_velocity', 1),
+    ('angular_friction', 1),
+]
+
+class PhysicsSystem(object):
+    def __init__(self, capacity=256):
+        self._components = []
+        self._arrays = {}
+        self._grow(capacity)
+
+    def __len__(self):
+        return len(self._components)
+
+    def add_handler(self, component):
+        if component._physics_system is self:
+            return
+        row = len(self._components)
+        if row == len(self._arrays['angle']):
+            self._grow(2 * row)
+        for name, size in PHYSICS_ATTRIBUTES:
+            self._arrays[name][row] = getattr(component, name)
+        self._components.append(component)
+        component._physics_system = self
+        component._physics_row = row
+
+    def remove_handler(self, component):
+        if component._physics_system is not self:
+            return
+
+        # Copy the state back so that the component keeps working on its own.
+        row = component._physics_row
+        state = [(name, self.get_attribute(row, name))
+                 for name, size in PHYSICS_ATTRIBUTES]
+        component._physics_system = None
+        component._physics_row = -1
+        for name, value in state:
+            setattr(component, name, value)
+
+        last_row = len(self._components) - 1
+        last_component = self._components.pop()
+        if last_component is not component:
+            for name, size in PHYSICS_ATTRIBUTES:
+                array = self._arrays[name]
+                array[row] = array[last_row]
+            self._components[row] = last_component
+            last_component._physics_row = row
+
+    def find_dead_handlers(self):
+        return [component for component in self._components
+                if component.deleted]
+
+    def get_attribute(self, row, name):
+        value = self._arrays[name][row]
+        if value.shape:
+            return tuple(value.tolist())
+        return float(value)
+
+    def set_attribute(self, row, name, value):
+        self._arrays[name][row] = value
+
+    def update(self, dt):
+        count = len(self._components)
+        if not count:
+            return
+        arrays = self._arrays
+        positions = arrays['position'][:count]
+        velocities = arrays['velocity'][:count]
+        max_velocities = arrays['max_velocity'][:count]
+        frictions = arrays['friction'][:count]
+        angles = arrays['angle'][:count]
+        angular_velocities = arrays['angular_velocity'][:count]
+        max_angular_velocities = arrays['max_angular_velocity'][:count]
+
+        velocities += dt * arrays['acceleration'][:count]
+
+        speeds_squared = numpy.einsum('ij,ij->i', velocities, velocities)
+        clamped = ((frictions > 0.0) |
+                   (speeds_squared > max_velocities * max_velocities))
+        if clamped.any():
+            speeds = numpy.sqrt(speeds_squared[clamped])
+            new_speeds = numpy.clip(speeds - dt * frictions[clamped], 0.0,
+                                    max_velocities[clamped])
+            moving = speeds > 0.0
+            scales = numpy.where(moving,
+                                 new_speeds / numpy.where(moving, speeds, 1.0),
+                                 0.0)
+            velocities[clamped] *= scales[:, numpy.newaxis]
+
+        positions += dt * velocities
+
+        angular_frictions = arrays['angular_friction'][:count]
+        angular_velocities += dt * arrays['angular_acceleration'][:count]
+        angular_velocities[:] = (numpy.sign(angular_velocities) *
+                                 numpy.maximum(0.0,
+                                               numpy.abs(angular_velocities) -
+                                               dt * angular_frictions))
+        numpy.clip(angular_velocities, -max_angular_velocities,
+                   max_angular_velocities, out=angular_velocities)
+
+        angles += dt * angular_velocities
+
+        cos_angles = numpy.cos(angles).tolist()
+        sin_angles = numpy.sin(angles).tolist()
+        for component, cos_angle, sin_angle, (x, y) in \
+                zip(self._components, cos_angles, sin_angles,
+                    positions.tolist()):
+            component.transform_component.transform = (cos_angle, -sin_angle,
+                                                       x, sin_angle,
+                                                       cos_angle, y)
+
+    def _grow(self, capacity):
+        count = len(self._components)
+        for name, size in PHYSICS_ATTRIBUTES:
+            shape = (capacity, size) if size > 1 else (capacity,)
+            array = numpy.zeros(shape)
+            if name in self._arrays:
+                array[:count] = self._arrays[name][:count]
+            self._arrays[name] = array
@@ -1,6 +1,12 @@
 # http://www.fundza.com/c4serious/noise/perlin/perlin.html
 
 import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 p = (
 151,160,137,91,90,15,131,13,201,95,96,53,194,233,7,225,140,36,103,
 30,69,142,8,99,37,240,21,10,23,190,6,148,247,120,234,75,0,26,197,
@@ -95,3 +101,84 @@ def pnoise(x, y, z):
     return lerp(w, 
     lerp(v, lerp(u, gradAA, gradBA), lerp(u, gradAB, gradBB)),
     lerp(v, lerp(u, gradAA1,gradBA1),lerp(u, gradAB1,gradBB1)))
+
+def fbm(x, y, z, octaves=4, lacunarity=2.0, gain=0.5):
+    total = 0.0
+    frequency = 1.0
+    amplitude = 1.0
+    for _ in xrange(octaves):
+        total += amplitude * pnoise(frequency * x, frequency * y,
+                                    frequency * z)
+        frequency *= lacunarity
+        amplitude *= gain
+    return total
+
+# The array versions below repeat the scalar arithmetic operation for
+# operation, so they return bit-identical results.
+
+def _grad_array(hash, x, y, z):
+    h = hash & 15
+    u = numpy.where(h < 8, x, y)
+    v = numpy.where(h < 4, y, numpy.where((h == 12) | (h == 14), x, z))
+    u = numpy.where(h & 1 != 0, -u, u)
+    v = numpy.where(h & 2 != 0, -v, v)
+    return u + v
+
+def pnoise_array(x, y, z):
+    x, y, z = numpy.broadcast_arrays(numpy.asarray(x, dtype=numpy.float64),
+                                     numpy.asarray(y, dtype=numpy.float64),
+                                     numpy.asarray(z, dtype=numpy.float64))
+    permutation = _permutation
+    floor_x = numpy.floor(x)
+    floor_y = numpy.floor(y)
+    floor_z = numpy.floor(z)
+    X = floor_x.astype(numpy.int64) & 255
+    Y = floor_y.astype(numpy.int64) & 255
+    Z = floor_z.astype(numpy.int64) & 255
+    x = x - floor_x
+    y = y - floor_y
+    z = z - floor_z
+
+    u = fade(x)
+    v = fade(y)
+    w = fade(z)
+
+    A = permutation[X] + Y
+    AA = permutation[A] + Z
+    AB = permutation[A + 1] + Z
+    B = permutation[X + 1] + Y
+    BA = permutation[B] + Z
+    BB = permutation[B + 1] + Z
+
+    gradAA = _grad_array(permutation[AA], x, y, z)
+    gradBA = _grad_array(permutation[BA], x - 1, y, z)
+    gradAB = _grad_array(permutation[AB], x, y - 1, z)
+    gradBB = _grad_array(permutation[BB], x - 1, y - 1, z)
+    gradAA1 = _grad_array(permutation[AA + 1], x, y, z - 1)
+    gradBA1 = _grad_array(permutation[BA + 1], x - 1, y, z - 1)
+    gradAB1 = _grad_array(permutation[AB + 1], x, y - 1, z - 1)
+    gradBB1 = _grad_array(permutation[BB + 1], x - 1, y - 1, z - 1)
+    return lerp(w,
+                lerp(v, lerp(u, gradAA, gradBA), lerp(u, gradAB, gradBB)),
+                lerp(v, lerp(u, gradAA1, gradBA1), lerp(u, gradAB1, gradBB1)))
+
+def pnoise_grid(xs, ys, z):
+    xs = numpy.asarray(xs, dtype=numpy.float64)
+    ys = numpy.asarray(ys, dtype=numpy.float64)
+    return pnoise_array(xs[:, numpy.newaxis], ys[numpy.newaxis, :], z)
+
+def fbm_grid(xs, ys, z, octaves=4, lacunarity=2.0, gain=0.5):
+    xs = numpy.asarray(xs, dtype=numpy.float64)
+    ys = numpy.asarray(ys, dtype=numpy.float64)
+    total = numpy.zeros((len(xs), len(ys)))
+    frequency = 1.0
+    amplitude = 1.0
+    for _ in xrange(octaves):
+        total += amplitude * pnoise_grid(frequency * xs, frequency * ys,
+                                         frequency * z)
+        frequency *= lacunarity
+        amplitude *= gain
+    return total
+
+if numpy is not None:
+    _permutation = numpy.array(p, dtype=numpy.int64)
@@ -0,0 +1,164 @@
+import ctypes
+import ctypes.util
+import json
+import time
+
+def _get_clock():
+    # Python 2 has no monotonic clock in the standard library, so call
+    # clock_gettime directly where it is available.
+    if hasattr(time, 'perf_counter'):
+        return time.perf_counter
+
+    class _Timespec(ctypes.Structure):
+        _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+    library_name = ctypes.util.find_library('rt') or \
+        ctypes.util.find_library('c')
+    try:
+        clock_gettime = ctypes.CDLL(library_name).clock_gettime
+    except (OSError, AttributeError, TypeError):
+        return time.time
+    clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(_Timespec)]
+    clock_monotonic = 1
+    timespec = _Timespec()
+
+    def clock():
+        clock_gettime(clock_monotonic, ctypes.byref(timespec))
+        return timespec.tv_sec + 1e-9 * timespec.tv_nsec
+
+    return clock
+
+clock = _get_clock()
+
+class ProfilerFrame(object):
+    def __init__(self, start_time):
+        self.start_time = start_time
+        self.end_time = start_time
+        self.phases = []
+
+    @property
+    def duration(self):
+        return self.end_time - self.start_time
+
+class ProfilerPhase(object):
+    def __init__(self, name, start_time):
+        self.name = name
+        self.start_time = start_time
+        self.end_time = start_time
+        self.handler_times = {}
+
+    @property
+    def duration(self):
+        return self.end_time - self.start_time
+
+    def add_handler_time(self, handler_class, duration):
+        name = handler_class.__name__
+        self.handler_times[name] = self.handler_times.get(name, 0.0) + duration
+
+class Profiler(object):
+    def __init__(self, capacity=600, enabled=True):
+        self.enabled = enabled
+        self.clock = clock
+        self._frames = [None] * capacity
+        self._frame_count = 0
+        self._frame = None
+        self._phase = None
+
+    @property
+    def frames(self):
+        capacity = len(self._frames)
+        if self._frame_count < capacity:
+            return self._frames[:self._frame_count]
+        index = self._frame_count % capacity
+        return self._frames[index:] + self._frames[:index]
+
+    def begin_frame(self):
+        if self.enabled and self._frame is None:
+            self._frame = ProfilerFrame(self.clock())
+
+    def end_frame(self):
+        if self._frame is not None:
+            self._frame.end_time = self.clock()
+            self._frames[self._frame_count % len(self._frames)] = self._frame
+            self._frame_count += 1
+            self._frame = None
+
+    def begin_phase(self, name):
+        self._phase = ProfilerPhase(name, self.clock())
+        return self._phase
+
+    def end_phase(self):
+        phase = self._phase
+        phase.end_time = self.clock()
+        if self._frame is not None:
+            self._frame.phases.append(phase)
+        self._phase = None
+
+    def get_frame_time_percentiles(self, percentiles=(50, 95, 99)):
+        durations = sorted(frame.duration for frame in self.frames)
+        if not durations:
+            return dict((percentile, 0.0) for percentile in percentiles)
+        result = {}
+        for percentile in percentiles:
+            rank = int(round(0.01 * percentile * len(durations)))
+            result[percentile] = durations[min(max(rank, 1),
+                                               len(durations)) - 1]
+        return result
+
+    def get_handler_times(self):
+        handler_times = {}
+        for frame in self.frames:
+            for phase in frame.phases:
+                for name, duration in phase.handler_times.iteritems():
+                    key = phase.name, name
+                    handler_times[key] = handler_times.get(key, 0.0) + \
+                        duration
+        return handler_times
+
+    def get_report(self):
+        frames = self.frames
+        lines = ['Frames: %d' % len(frames)]
+        percentiles = self.get_frame_time_percentiles()
+        for percentile in sorted(percentiles):
+            lines.append('p%d frame time: %f' % (percentile,
+                                                 percentiles[percentile]))
+        handler_times = self.get_handler_times()
+        total_time = max(sum(handler_times.itervalues()), 1e-9)
+        for (phase_name, name), duration in \
+                sorted(handler_times.iteritems(), key=lambda item: -item[1]):
+            time_percentage = int(round(100.0 * duration / total_time))
+            lines.append('%3d%%  %s/%s' % (time_percentage, phase_name, name))
+        return '\n'.join(lines)
+
+    def dump_chrome_trace(self, path):
+        # Handler times are totals per class, so they are attached to their
+        # phase events as arguments rather than emitted as events.
+        frames = self.frames
+        events = []
+        if frames:
+            base_time = frames[0].start_time
+            for frame in frames:
+                events.append(self._get_trace_event('frame', 'frame', frame,
+                                                    base_time, {}))
+                for phase in frame.phases:
+                    args = dict((name, 1000.0 * duration)
+                                for name, duration
+                                in phase.handler_times.iteritems())
+                    events.append(self._get_trace_event(phase.name, 'phase',
+                                                        phase, base_time,
+                                                        args))
+        with open(path, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'},
+                      trace_file)
+
+    def _get_trace_event(self, name, category, span, base_time, args):
+        return {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': 1e6 * (span.start_time - base_time),
+            'dur': 1e6 * span.duration,
+            'pid': 0,
+            'tid': 0,
+            'args': args,
+        }
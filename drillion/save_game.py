@@ -0,0 +1,188 @@
+from drillion.lifetime_component import LifetimeComponent
+from drillion.physics_component import PhysicsComponent
+from drillion.physics_system import PHYSICS_ATTRIBUTES
+from drillion.sprite_component import SpriteComponent
+from drillion.terrain import TerrainChunk
+
+import mmap
+import numpy
+import os
+import struct
+
+SAVE_MAGIC = 'DRILLION'
+SAVE_VERSION = 2
+
+_HEADER = struct.Struct('<8sIIqdIII')
+
+SHIP_DTYPE = numpy.dtype(
+    [('alive', numpy.uint8)] +
+    [(name, '<f8', (size,)) if size > 1 else (name, '<f8')
+     for name, size in PHYSICS_ATTRIBUTES])
+
+BULLET_DTYPE = numpy.dtype([
+    ('position', '<f8', (2,)),
+    ('velocity', '<f8', (2,)),
+    ('color', numpy.uint8, (4,)),
+    ('lifetime', '<f8'),
+])
+
+CHUNK_POSITION_DTYPE = numpy.dtype([('x', '<i4'), ('y', '<i4')])
+
+def save_world(world, path):
+    generator = world.terrain_system.generator
+    chunk_size = generator.chunk_size
+    chunks = sorted(world.terrain_system.iter_modified_chunks(),
+                    key=lambda chunk: chunk.chunk_position)
+
+    ship_states = numpy.zeros(len(world.ships), dtype=SHIP_DTYPE)
+    for ship_state, ship_entity in zip(ship_states, world.ships):
+        if not ship_entity.alive:
+            continue
+        ship_state['alive'] = 1
+        physics_component = ship_entity.find_component(PhysicsComponent)
+        for name, size in PHYSICS_ATTRIBUTES:
+            ship_state[name] = getattr(physics_component, name)
+
+    bullet_entities = list(world.bullet_pool.iter_active_entities())
+    bullet_states = numpy.zeros(len(bullet_entities), dtype=BULLET_DTYPE)
+    for bullet_state, bullet_entity in zip(bullet_states, bullet_entities):
+        physics_component = bullet_entity.find_component(PhysicsComponent)
+        sprite_component = bullet_entity.find_component(SpriteComponent)
+        lifetime_component = bullet_entity.find_component(LifetimeComponent)
+        bullet_state['position'] = physics_component.position
+        bullet_state['velocity'] = physics_component.velocity
+        bullet_state['color'] = sprite_component.sprite.color
+        bullet_state['lifetime'] = lifetime_component.remaining_lifetime
+
+    chunk_positions = numpy.array([chunk.chunk_position for chunk in chunks],
+                                  dtype=CHUNK_POSITION_DTYPE)
+    health = numpy.zeros((len(chunks), chunk_size, chunk_size),
+                         dtype='<f8')
+    colors = numpy.zeros((len(chunks), chunk_size, chunk_size, 4),
+                         dtype=numpy.uint8)
+    for index, chunk in enumerate(chunks):
+        health[index] = chunk.health
+        colors[index] = chunk.colors
+
+    # Write next to the target and rename over it, so that a save that is
+    # currently mapped stays valid until the new one is complete.
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, chunk_size,
+                             generator.seed, generator.noise_scale,
+                             len(chunks), len(ship_states),
+                             len(bullet_states)))
+        for array in (ship_states, bullet_states, chunk_positions, health,
+                      colors):
+            f.write(array.tostring())
+    os.rename(temp_path, path)
+
+class SaveFile(object):
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError('Save file is truncated')
+        (magic, version, self._chunk_size, self._terrain_seed,
+         self._noise_scale, chunk_count, ship_count,
+         bullet_count) = _HEADER.unpack_from(self._mmap)
+        if magic != SAVE_MAGIC:
+            raise ValueError('Not a save file')
+        if version != SAVE_VERSION:
+            raise ValueError('Unsupported save file version: %d' % version)
+
+        chunk_area = self._chunk_size * self._chunk_size
+        offset = _HEADER.size
+        self._ship_states, offset = self._read_array(SHIP_DTYPE, ship_count,
+                                                     offset)
+        self._bullet_states, offset = self._read_array(BULLET_DTYPE,
+                                                       bullet_count, offset)
+        chunk_positions, offset = self._read_array(CHUNK_POSITION_DTYPE,
+                                                   chunk_count, offset)
+
+        # Terrain stays in the mapping and is only read a chunk at a time,
+        # as the terrain system streams it in.
+        self._health_offset = offset
+        self._colors_offset = offset + 8 * chunk_area * chunk_count
+        if self._colors_offset + 4 * chunk_area * chunk_count > \
+                len(self._mmap):
+            raise ValueError('Save file is truncated')
+        self._chunk_indices = dict(((int(x), int(y)), index)
+                                   for index, (x, y) in
+                                   enumerate(chunk_positions))
+
+    @property
+    def chunk_size(self):
+        return self._chunk_size
+
+    @property
+    def terrain_seed(self):
+        return self._terrain_seed
+
+    @property
+    def noise_scale(self):
+        return self._noise_scale
+
+    @property
+    def chunk_positions(self):
+        return self._chunk_indices.keys()
+
+    def __contains__(self, chunk_position):
+        return chunk_position in self._chunk_indices
+
+    def get_chunk(self, chunk_position):
+        index = self._chunk_indices[chunk_position]
+        size = self._chunk_size
+        chunk_area = size * size
+        health = numpy.frombuffer(self._mmap, dtype='<f8', count=chunk_area,
+                                  offset=(self._health_offset +
+                                          8 * chunk_area * index))
+        colors = numpy.frombuffer(self._mmap, dtype=numpy.uint8,
+                                  count=(4 * chunk_area),
+                                  offset=(self._colors_offset +
+                                          4 * chunk_area * index))
+        chunk = TerrainChunk(chunk_position,
+                             health.reshape(size, size).astype(numpy.float64),
+                             colors.reshape(size, size, 4).copy())
+        chunk.modified = True
+        return chunk
+
+    def restore(self, world):
+        generator = world.terrain_system.generator
+        if (generator.chunk_size, generator.seed, generator.noise_scale) != \
+                (self._chunk_size, self._terrain_seed, self._noise_scale):
+            raise ValueError('Save file was made with different terrain')
+        if len(world.ships) != len(self._ship_states):
+            raise ValueError('Save file has %d ships, world has %d' %
+                             (len(self._ship_states), len(world.ships)))
+        world.terrain_system.saved_terrain = self
+
+        for ship_state, ship_entity in zip(self._ship_states, world.ships):
+            if not ship_state['alive']:
+                world.entity_manager.destroy_entity(ship_entity)
+                continue
+            physics_component = ship_entity.find_component(PhysicsComponent)
+            for name, size in PHYSICS_ATTRIBUTES:
+                value = ship_state[name]
+                setattr(physics_component, name,
+                        tuple(value) if size > 1 else float(value))
+
+        for bullet_state in self._bullet_states:
+            world.bullet_pool.spawn(
+                position=tuple(bullet_state['position']),
+                velocity=tuple(bullet_state['velocity']),
+                color=tuple(int(c) for c in bullet_state['color']),
+                lifetime=float(bullet_state['lifetime']))
+
+    def close(self):
+        self._mmap.close()
+
+    def _read_array(self, dtype, count, offset):
+        end_offset = offset + dtype.itemsize * count
+        if end_offset > len(self._mmap):
+            raise ValueError('Save file is truncated')
+        if not count:
+            return numpy.zeros(0, dtype=dtype), end_offset
+        array = numpy.frombuffer(self._mmap, dtype=dtype, count=count,
+                                 offset=offset).copy()
+        return array, end_offset
@@ -5,14 +5,12 @@ import math
 import random
 
 class ShipControlComponent(Component):
-    def __init__(self, physics_component, update_phase, bullet_entity_creator,
-                 entity_manager):
+    def __init__(self, physics_component, update_phase, bullet_pool):
         super(ShipControlComponent, self).__init__()
 
         self.physics_component = physics_component
         self.update_phase = update_phase
-        self.bullet_entity_creator = bullet_entity_creator
-        self.entity_manager = entity_manager
+        self.bullet_pool = bullet_pool
 
         self.max_thrust_acceleration = 10.0
         self.max_turn_acceleration = 8.0 * math.pi
@@ -68,7 +66,4 @@ class ShipControlComponent(Component):
             velocity_y += bullet_velocity * normal_y
             velocity = velocity_x, velocity_y
 
-            bullet_entity = \
-                self.bullet_entity_creator.create(position=position,
-                                                  velocity=velocity)
-            self.entity_manager.add_entity(bullet_entity)
+            self.bullet_pool.spawn(position=position, velocity=velocity)
@@ -8,37 +8,36 @@ from drillion.physics_component import PhysicsComponent
 from drillion.ship_control_component import ShipControlComponent
 from drillion.ship_input_component import ShipInputComponent
 from drillion.ship_keys import PLAYER_1_SHIP_KEYS
-from drillion.sprite import PolygonSprite
+from drillion.sprite import BatchPolygonSprite
 from drillion.sprite_component import SpriteComponent
 from drillion.transform_component import TransformComponent
 
 class ShipEntityCreator(object):
     def __init__(self, input_update_phase, control_update_phase,
-                 physics_update_phase, collision_transform_update_phase,
-                 animation_update_phase, draw_phase, key_state_handler,
-                 collision_detector, batch, bullet_entity_creator,
-                 entity_manager):
+                 physics_update_phase, transform_hierarchy,
+                 collision_transform_update_phase, draw_phase,
+                 key_state_handler, collision_detector, batch, bullet_pool):
         self._input_update_phase = input_update_phase
         self._control_update_phase = control_update_phase
         self._physics_update_phase = physics_update_phase
+        self._transform_hierarchy = transform_hierarchy
         self._collision_transform_update_phase = \
             collision_transform_update_phase
-        self._animation_update_phase = animation_update_phase
 
         self._draw_phase = draw_phase
         self._key_state_handler = key_state_handler
         self._collision_detector = collision_detector
         self._batch = batch
 
-        self._bullet_entity_creator = bullet_entity_creator
-        self._entity_manager = entity_manager
+        self._bullet_pool = bullet_pool
 
     def create(self, position=(0.0, 0.0), angle=0.0, color=WHITE,
                keys=PLAYER_1_SHIP_KEYS):
         vertices = generate_circle_vertices(3)
         polygon = Polygon2(vertices)
 
-        transform_component = TransformComponent()
+        transform_component = \
+            TransformComponent(hierarchy=self._transform_hierarchy)
         physics_component = PhysicsComponent(transform_component,
                                              self._physics_update_phase,
                                              position=position,
@@ -52,24 +51,22 @@ class ShipEntityCreator(object):
 
         control_component = ShipControlComponent(physics_component,
                                                  self._control_update_phase,
-                                                 self._bullet_entity_creator,
-                                                 self._entity_manager)
+                                                 self._bullet_pool)
         input_component = ShipInputComponent(self._input_update_phase,
                                              control_component,
                                              self._key_state_handler, keys)
 
         vertices = generate_circle_vertices(3)
-        sprite = PolygonSprite(vertices, color=color)
+        sprite = BatchPolygonSprite(vertices, color=color)
         sprite_component = SpriteComponent(sprite, self._batch)
 
         animation_component = AnimationComponent(transform_component,
                                                  sprite_component,
-                                                 self._animation_update_phase,
                                                  self._draw_phase)
 
         components = [transform_component, physics_component,
                       collision_component, control_component, input_component,
                       sprite_component, animation_component]
-        entity = Entity(components)
+        entity = Entity(components, category='ship')
         collision_body.user_data = 'ship', entity
         return entity
@@ -5,6 +5,12 @@ from drillion.utils import flatten
 import pyglet
 from pyglet.gl import *
 
+try:
+    import numpy
+    import numpy.ctypeslib
+except ImportError:
+    numpy = None
+
 class PolygonSprite(object):
     def __init__(self, vertices=[], color=WHITE, transform=Transform2(),
                  group=None, batch=None):
@@ -23,8 +29,15 @@ class PolygonSprite(object):
 
     @vertices.setter
     def vertices(self, vertices):
-        self._vertices = list(vertices)
-        self._update_vertex_list()
+        vertices = list(vertices)
+        if len(vertices) != len(self._vertices):
+            # The index data depends on the vertex count.
+            self._delete_vertex_list()
+            self._vertices = vertices
+            self._create_vertex_list()
+        elif vertices != self._vertices:
+            self._vertices = vertices
+            self._update_vertices()
 
     @property
     def color(self):
@@ -32,8 +45,9 @@ class PolygonSprite(object):
 
     @color.setter
     def color(self, color):
-        self._color = color
-        self._update_vertex_list()
+        if tuple(color) != tuple(self._color):
+            self._color = color
+            self._update_colors()
 
     @property
     def transform(self):
@@ -41,8 +55,10 @@ class PolygonSprite(object):
 
     @transform.setter
     def transform(self, transform):
-        self._transform.assign(*transform)
-        self._update_vertex_list()
+        transform = tuple(transform)
+        if transform != tuple(self._transform):
+            self._transform.assign(*transform)
+            self._update_vertices()
 
     @property
     def group(self):
@@ -73,7 +89,7 @@ class PolygonSprite(object):
                                     for i in xrange(1, vertex_count - 1)))
             vertex_data = tuple(flatten(self.transform.transform_point(*v)
                                         for v in self.vertices))
-            color_data = len(self.vertices) * self.color
+            color_data = len(self.vertices) * tuple(self.color)
             self._vertex_list = self._batch.add_indexed(vertex_count,
                                                         GL_TRIANGLES,
                                                         self._group, indices,
@@ -85,9 +101,350 @@ class PolygonSprite(object):
             self._vertex_list.delete()
             self._vertex_list = None
 
-    def _update_vertex_list(self):
+    def _update_vertices(self):
         if self._vertex_list is not None:
             vertex_data = tuple(flatten(self.transform.transform_point(*v)
                                         for v in self.vertices))
             self._vertex_list.vertices = vertex_data
-            self._vertex_list.colors = len(self.vertices) * self.color
+
+    def _update_colors(self):
+        if self._vertex_list is not None:
+            self._vertex_list.colors = len(self.vertices) * tuple(self.color)
+
+class SpriteBatch(object):
+    def __init__(self, group=None, batch=None, capacity=1024, static=False):
+        if numpy is None:
+            raise ImportError('SpriteBatch requires NumPy')
+        self._group = group
+        self._batch = batch
+        self._static = static
+        self._vertex_list = None
+        self._capacity = 0
+        self._vertex_count = 0
+        self._removed_vertex_count = 0
+        self._sprite_count = 0
+        self._sprites = []
+        self._sprite_alive = numpy.zeros(0, dtype=bool)
+        self._sprite_dirty = numpy.zeros(0, dtype=bool)
+        self._transforms = numpy.zeros((0, 6))
+        self._local_vertices = numpy.zeros((0, 2))
+        self._vertex_sprite_indices = numpy.zeros(0, dtype=numpy.intp)
+        self._fan_starts = numpy.zeros(0, dtype=numpy.intp)
+        self._fan_vertices = numpy.zeros(0, dtype=bool)
+        self._vertex_data = numpy.zeros((0, 2), dtype=numpy.float32)
+        self._color_data = numpy.zeros((0, 4), dtype=numpy.uint8)
+        self._index_data = numpy.zeros(0, dtype=numpy.uint32)
+        self._transforms_dirty = False
+        self._vertex_range = None
+        self._color_range = None
+        self._index_range = None
+        self._uploaded_vertex_count = 0
+        self._reserve(capacity)
+
+    @property
+    def static(self):
+        return self._static
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def sprite_count(self):
+        return self._sprite_count
+
+    @property
+    def vertex_count(self):
+        return self._vertex_count - self._removed_vertex_count
+
+    @property
+    def vertex_data(self):
+        return self._vertex_data[:self._vertex_count]
+
+    @property
+    def color_data(self):
+        return self._color_data[:self._vertex_count]
+
+    @property
+    def index_data(self):
+        return self._index_data
+
+    @property
+    def uploaded_vertex_count(self):
+        return self._uploaded_vertex_count
+
+    def draw(self, alpha):
+        self.update()
+
+    def update(self):
+        if 2 * self._removed_vertex_count > self._vertex_count:
+            self._compact()
+
+        # Transform the vertices of every sprite that has moved since the
+        # last update in one step.
+        if self._transforms_dirty:
+            count = self._vertex_count
+            sprite_indices = self._vertex_sprite_indices[:count]
+            vertices = numpy.flatnonzero(self._sprite_dirty[sprite_indices])
+            if len(vertices):
+                transforms = self._transforms[sprite_indices[vertices]]
+                x = self._local_vertices[vertices, 0]
+                y = self._local_vertices[vertices, 1]
+                self._vertex_data[vertices, 0] = (transforms[:, 0] * x +
+                                                  transforms[:, 1] * y +
+                                                  transforms[:, 2])
+                self._vertex_data[vertices, 1] = (transforms[:, 3] * x +
+                                                  transforms[:, 4] * y +
+                                                  transforms[:, 5])
+                self._vertex_range = self._get_dirty_range(
+                    self._vertex_range, vertices[0], vertices[-1] + 1)
+            self._sprite_dirty[:len(self._sprites)] = False
+            self._transforms_dirty = False
+
+        if self._index_range is not None:
+            self._update_indices(*self._index_range)
+        self._upload()
+
+    def delete(self):
+        for sprite in self._sprites:
+            if sprite is not None:
+                sprite._sprite_batch = None
+                sprite._sprite_index = -1
+        self._delete_vertex_list()
+
+    def _add_sprite(self, sprite):
+        vertex_count = len(sprite.vertices)
+        start = self._vertex_count
+        end = start + vertex_count
+        if end > self._capacity or len(self._sprites) >= self._capacity:
+            self._reserve(max(2 * self._capacity, end))
+
+        sprite_index = len(self._sprites)
+        self._sprites.append(sprite)
+        self._sprite_alive[sprite_index] = True
+        self._sprite_dirty[sprite_index] = True
+        self._transforms[sprite_index] = tuple(sprite.transform)
+        self._local_vertices[start:end] = sprite.vertices
+        self._vertex_sprite_indices[start:end] = sprite_index
+        self._fan_starts[start:end] = start
+        self._fan_vertices[start:end] = False
+        self._fan_vertices[start + 1:end - 1] = True
+        self._color_data[start:end] = sprite.color
+        self._vertex_count = end
+        self._sprite_count += 1
+        self._transforms_dirty = True
+        self._color_range = self._get_dirty_range(self._color_range, start,
+                                                  end)
+        self._index_range = self._get_dirty_range(self._index_range, start,
+                                                  end)
+
+        sprite._sprite_index = sprite_index
+        sprite._vertex_start = start
+
+    def _remove_sprite(self, sprite):
+        # Removed sprites leave a hole whose triangles are cleared right
+        # away and that is reclaimed once holes make up half the vertices.
+        sprite_index = sprite._sprite_index
+        start = sprite._vertex_start
+        end = start + len(sprite.vertices)
+        self._sprites[sprite_index] = None
+        self._sprite_alive[sprite_index] = False
+        self._fan_vertices[start:end] = False
+        self._removed_vertex_count += end - start
+        self._sprite_count -= 1
+        self._index_range = self._get_dirty_range(self._index_range, start,
+                                                  end)
+
+        sprite._sprite_index = -1
+        sprite._vertex_start = -1
+
+    def _set_sprite_transform(self, sprite, transform):
+        self._transforms[sprite._sprite_index] = tuple(transform)
+        self._sprite_dirty[sprite._sprite_index] = True
+        self._transforms_dirty = True
+
+    def _set_sprite_color(self, sprite, color):
+        start = sprite._vertex_start
+        end = start + len(sprite.vertices)
+        self._color_data[start:end] = color
+        self._color_range = self._get_dirty_range(self._color_range, start,
+                                                  end)
+
+    def _compact(self):
+        count = self._vertex_count
+        sprite_count = len(self._sprites)
+        sprite_alive = self._sprite_alive[:sprite_count]
+        vertex_alive = sprite_alive[self._vertex_sprite_indices[:count]]
+        sprite_indices = numpy.cumsum(sprite_alive) - 1
+        vertex_indices = numpy.cumsum(vertex_alive) - 1
+        new_count = int(vertex_alive.sum())
+        new_sprite_count = int(sprite_alive.sum())
+
+        for array in (self._transforms, self._sprite_dirty):
+            array[:new_sprite_count] = array[:sprite_count][sprite_alive]
+        self._sprite_alive[:new_sprite_count] = True
+        self._sprite_alive[new_sprite_count:] = False
+        self._sprite_dirty[new_sprite_count:] = False
+        for array in (self._local_vertices, self._fan_vertices,
+                      self._vertex_data, self._color_data):
+            array[:new_count] = array[:count][vertex_alive]
+        self._fan_vertices[new_count:count] = False
+        self._vertex_sprite_indices[:new_count] = \
+            sprite_indices[self._vertex_sprite_indices[:count][vertex_alive]]
+        self._fan_starts[:new_count] = \
+            vertex_indices[self._fan_starts[:count][vertex_alive]]
+
+        self._sprites = [sprite for sprite in self._sprites
+                         if sprite is not None]
+        for sprite_index, sprite in enumerate(self._sprites):
+            sprite._sprite_index = sprite_index
+            sprite._vertex_start = int(vertex_indices[sprite._vertex_start])
+        self._vertex_count = new_count
+        self._removed_vertex_count = 0
+        self._vertex_range = 0, new_count
+        self._color_range = 0, new_count
+        self._index_range = 0, count
+
+    def _update_indices(self, start, end):
+        # Each polygon is a triangle fan, with one triangle for every
+        # vertex but the first and the last. Every vertex has a triangle
+        # slot of its own, so that adding or removing a sprite only
+        # touches the slots of its vertices. Unused slots stay zero and
+        # make up empty triangles.
+        fan_vertices = self._fan_vertices[start:end]
+        vertices = numpy.arange(start, end)
+        triangles = self._index_data[3 * start:3 * end].reshape(-1, 3)
+        triangles[:, 0] = numpy.where(fan_vertices,
+                                      self._fan_starts[start:end], 0)
+        triangles[:, 1] = numpy.where(fan_vertices, vertices, 0)
+        triangles[:, 2] = numpy.where(fan_vertices, vertices + 1, 0)
+
+    def _upload(self):
+        # Only the changed span of each attribute is written, so pyglet
+        # only sends that span to the buffer object.
+        if self._vertex_list is not None:
+            if self._vertex_range is not None:
+                start, end = self._vertex_range
+                self._upload_range('vertices', self._vertex_data, start, end)
+                self._uploaded_vertex_count += end - start
+            if self._color_range is not None:
+                start, end = self._color_range
+                self._upload_range('colors', self._color_data, start, end)
+            if self._index_range is not None:
+                start, end = self._index_range
+                self._upload_indices(start, end)
+        self._vertex_range = None
+        self._color_range = None
+        self._index_range = None
+
+    def _upload_range(self, name, data, start, end):
+        attribute = self._vertex_list.domain.attribute_names[name]
+        region = attribute.get_region(attribute.buffer,
+                                      self._vertex_list.start + start,
+                                      end - start)
+        numpy.ctypeslib.as_array(region.array)[:] = data[start:end].ravel()
+        region.invalidate()
+
+    def _upload_indices(self, start, end):
+        region = self._vertex_list.domain.get_index_region(
+            self._vertex_list.index_start + 3 * start, 3 * (end - start))
+        numpy.ctypeslib.as_array(region.array)[:] = \
+            self._index_data[3 * start:3 * end] + self._vertex_list.start
+        region.invalidate()
+
+    def _get_dirty_range(self, dirty_range, start, end):
+        if dirty_range is None:
+            return start, end
+        dirty_start, dirty_end = dirty_range
+        return min(dirty_start, start), max(dirty_end, end)
+
+    def _reserve(self, capacity):
+        for name in ('_sprite_alive', '_sprite_dirty', '_transforms',
+                     '_local_vertices', '_vertex_sprite_indices',
+                     '_fan_starts', '_fan_vertices', '_vertex_data',
+                     '_color_data'):
+            array = getattr(self, name)
+            new_array = numpy.zeros((capacity,) + array.shape[1:],
+                                    dtype=array.dtype)
+            new_array[:len(array)] = array
+            setattr(self, name, new_array)
+        self._index_data = numpy.zeros(3 * capacity, dtype=numpy.uint32)
+        self._capacity = capacity
+
+        # Static batches get their own buffer objects, so that uploads
+        # for moving sprites never touch them.
+        self._delete_vertex_list()
+        if self._batch is not None:
+            usage = 'static' if self._static else 'stream'
+            self._vertex_list = self._batch.add_indexed(
+                capacity, GL_TRIANGLES, self._group, [0] * (3 * capacity),
+                'v2f/' + usage, 'c4B/' + usage)
+            if self._vertex_count:
+                self._vertex_range = 0, self._vertex_count
+                self._color_range = 0, self._vertex_count
+        if self._vertex_count:
+            self._index_range = 0, self._vertex_count
+
+    def _delete_vertex_list(self):
+        if self._vertex_list is not None:
+            self._vertex_list.delete()
+            self._vertex_list = None
+
+class BatchPolygonSprite(object):
+    def __init__(self, vertices=[], color=WHITE, transform=Transform2(),
+                 batch=None):
+        self._vertices = list(vertices)
+        self._color = color
+        self._transform = Transform2(*transform)
+        self._sprite_batch = None
+        self._sprite_index = -1
+        self._vertex_start = -1
+        self.batch = batch
+
+    @property
+    def vertices(self):
+        return self._vertices
+
+    @vertices.setter
+    def vertices(self, vertices):
+        sprite_batch = self._sprite_batch
+        self.batch = None
+        self._vertices = list(vertices)
+        self.batch = sprite_batch
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, color):
+        if tuple(color) != tuple(self._color):
+            self._color = color
+            if self._sprite_batch is not None:
+                self._sprite_batch._set_sprite_color(self, color)
+
+    @property
+    def transform(self):
+        return self._transform
+
+    @transform.setter
+    def transform(self, transform):
+        transform = tuple(transform)
+        if transform != tuple(self._transform):
+            self._transform.assign(*transform)
+            if self._sprite_batch is not None:
+                self._sprite_batch._set_sprite_transform(self,
+                                                         self._transform)
+
+    @property
+    def batch(self):
+        return self._sprite_batch
+
+    @batch.setter
+    def batch(self, batch):
+        if batch is not self._sprite_batch:
+            if self._sprite_batch is not None:
+                self._sprite_batch._remove_sprite(self)
+            self._sprite_batch = batch
+            if batch is not None:
+                batch._add_sprite(self)
@@ -0,0 +1,368 @@
+from drillion.color_component import ColorComponent
+from drillion.color_generator import ColorGenerator, ClampedGaussGenerator
+from drillion.health_component import HealthComponent
+from drillion.maths import Box2, cf2ub
+from drillion.pnoise import pnoise_grid
+from drillion.profiler import clock
+from drillion.transform_component import TransformComponent
+
+import multiprocessing
+import numpy
+import random
+import zlib
+
+_generator = None
+
+def _init_worker(generator):
+    global _generator
+    _generator = generator
+
+def _generate_chunk(chunk_position):
+    return _generator.generate_chunk(chunk_position)
+
+class TerrainChunk(object):
+    def __init__(self, chunk_position, health, colors):
+        self.chunk_position = chunk_position
+        self.health = health
+        self.colors = colors
+        self.modified = False
+        self.block_entities = {}
+
+    @property
+    def chunk_size(self):
+        return len(self.health)
+
+def serialize_chunk(chunk):
+    size = chunk.chunk_size
+    data = (chunk.health.astype(numpy.float64).tostring() +
+            chunk.colors.astype(numpy.uint8).tostring())
+    return size, zlib.compress(data)
+
+def deserialize_chunk(chunk_position, serialized_chunk):
+    size, compressed_data = serialized_chunk
+    data = zlib.decompress(compressed_data)
+    health_size = 8 * size * size
+    health = numpy.fromstring(data[:health_size], dtype=numpy.float64)
+    colors = numpy.fromstring(data[health_size:], dtype=numpy.uint8)
+    chunk = TerrainChunk(chunk_position, health.reshape(size, size),
+                         colors.reshape(size, size, 4))
+    chunk.modified = True
+    return chunk
+
+class TerrainGenerator(object):
+    def __init__(self, chunk_size=8, seed=None, noise_scale=0.15):
+        if seed is None:
+            seed = random.randrange(1 << 30)
+        self._chunk_size = chunk_size
+        self._seed = seed
+        self._noise_scale = noise_scale
+
+        seed_random = random.Random(seed)
+        self._seed_x = 1000.0 * seed_random.random()
+        self._seed_y = 1000.0 * seed_random.random()
+        self._seed_z = 1000.0 * seed_random.random()
+        self._hue = seed_random.uniform(0.0, 1.0)
+
+    @property
+    def chunk_size(self):
+        return self._chunk_size
+
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def noise_scale(self):
+        return self._noise_scale
+
+    def generate_chunk(self, chunk_position):
+        # Each chunk draws its colors from its own random generator, so a
+        # chunk comes out the same whenever and in whatever order it is
+        # generated.
+        chunk_x, chunk_y = chunk_position
+        size = self._chunk_size
+        grid_xs = numpy.arange(chunk_x * size, (chunk_x + 1) * size,
+                               dtype=numpy.float64)
+        grid_ys = numpy.arange(chunk_y * size, (chunk_y + 1) * size,
+                               dtype=numpy.float64)
+        densities = pnoise_grid(self._seed_x + self._noise_scale * grid_xs,
+                                self._seed_y + self._noise_scale * grid_ys,
+                                self._seed_z)
+        health = numpy.where(densities > 0.0, 1.0, 0.0)
+
+        # Keep a clearing around the origin for the ships to start in.
+        for grid_x in xrange(-2, 2):
+            for grid_y in xrange(-1, 1):
+                x = grid_x - chunk_x * size
+                y = grid_y - chunk_y * size
+                if 0 <= x < size and 0 <= y < size:
+                    health[x, y] = 0.0
+
+        chunk_random = random.Random((self._seed, chunk_x, chunk_y))
+        color_generator = ColorGenerator(
+            hue_generator=ClampedGaussGenerator(self._hue, 0.05,
+                                                random=chunk_random),
+            lightness_generator=ClampedGaussGenerator(0.4, 0.1,
+                                                      random=chunk_random),
+            saturation_generator=ClampedGaussGenerator(0.2, 0.05,
+                                                       random=chunk_random),
+        )
+        colors = numpy.zeros((size, size, 4), dtype=numpy.uint8)
+        for x, y in zip(*numpy.nonzero(health)):
+            colors[x, y] = [cf2ub(c) for c in color_generator.generate()]
+        return TerrainChunk(chunk_position, health, colors)
+
+class TerrainWorkerPool(object):
+    def __init__(self, generator, processes=None):
+        self._pool = multiprocessing.Pool(processes, initializer=_init_worker,
+                                          initargs=(generator,))
+
+    def request_chunk(self, chunk_position):
+        return self._pool.apply_async(_generate_chunk, (chunk_position,))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+class TerrainSystem(object):
+    def __init__(self, entity_manager, block_entity_creator, generator,
+                 tile_size=2.0, active_radius=2, worker_pool=None,
+                 install_budget=None):
+        self._entity_manager = entity_manager
+        self._block_entity_creator = block_entity_creator
+        self._generator = generator
+        self._tile_size = tile_size
+        self._active_radius = active_radius
+        self._worker_pool = worker_pool
+        self._install_budget = install_budget
+        self._chunks = {}
+        self._stored_chunks = {}
+        self._pending_chunks = {}
+        self._ready_chunks = {}
+        self._saved_terrain = None
+        self._focus_entities = []
+        self._active_bounds = Box2()
+        self._clear_active_bounds()
+
+    @property
+    def generator(self):
+        return self._generator
+
+    @property
+    def chunks(self):
+        return self._chunks
+
+    @property
+    def stored_chunks(self):
+        return self._stored_chunks
+
+    @property
+    def active_bounds(self):
+        return self._active_bounds
+
+    @property
+    def pending_count(self):
+        return len(self._pending_chunks) + len(self._ready_chunks)
+
+    @property
+    def saved_terrain(self):
+        return self._saved_terrain
+
+    @saved_terrain.setter
+    def saved_terrain(self, saved_terrain):
+        if self._chunks or self._stored_chunks:
+            raise ValueError('Terrain chunks are already loaded')
+        self._saved_terrain = saved_terrain
+
+    def add_focus(self, entity):
+        self._focus_entities.append(entity)
+
+    def remove_focus(self, entity):
+        self._focus_entities.remove(entity)
+
+    def get_chunk_position(self, x, y):
+        chunk_span = self._tile_size * float(self._generator.chunk_size)
+        return int(x // chunk_span), int(y // chunk_span)
+
+    def load_area(self, grid_x1, grid_y1, grid_x2, grid_y2):
+        chunk_size = self._generator.chunk_size
+        for chunk_x in xrange(grid_x1 // chunk_size,
+                              (grid_x2 - 1) // chunk_size + 1):
+            for chunk_y in xrange(grid_y1 // chunk_size,
+                                  (grid_y2 - 1) // chunk_size + 1):
+                if (chunk_x, chunk_y) not in self._chunks:
+                    self.activate_chunk((chunk_x, chunk_y))
+
+    def update(self, dt):
+        self._focus_entities = [entity for entity in self._focus_entities
+                                if entity.alive]
+        if not self._focus_entities:
+            self._clear_active_bounds()
+            return
+        focus_positions = []
+        for entity in self._focus_entities:
+            transform_component = entity.find_component(TransformComponent)
+            transform = transform_component.world_transform
+            focus_positions.append(self.get_chunk_position(transform.c,
+                                                           transform.f))
+
+        radius = self._active_radius
+        self._update_active_bounds(focus_positions, radius)
+        if self._worker_pool is not None:
+            self._request_chunks(focus_positions, radius + 1)
+            self._collect_chunks()
+
+        # Install the nearest chunks first, and stop once the frame's
+        # budget is spent. Chunks that the workers are still generating
+        # are left for a later frame, unless a ship is already inside one.
+        missing_chunks = []
+        for focus_x, focus_y in focus_positions:
+            for chunk_x in xrange(focus_x - radius, focus_x + radius + 1):
+                for chunk_y in xrange(focus_y - radius, focus_y + radius + 1):
+                    if (chunk_x, chunk_y) not in self._chunks:
+                        distance = max(abs(chunk_x - focus_x),
+                                       abs(chunk_y - focus_y))
+                        missing_chunks.append((distance, (chunk_x, chunk_y)))
+        missing_chunks.sort()
+        start_time = clock()
+        installed = False
+        for distance, chunk_position in missing_chunks:
+            if chunk_position in self._chunks:
+                continue
+            if installed and self._install_budget is not None and \
+                    clock() - start_time > self._install_budget:
+                break
+            if chunk_position in self._pending_chunks and distance:
+                continue
+            self.activate_chunk(chunk_position)
+            installed = True
+
+        # Evict one chunk further out than we activate, so that a ship
+        # moving back and forth over a chunk border does not thrash.
+        for chunk_positions in (self._chunks.keys(),
+                                self._ready_chunks.keys()):
+            for chunk_x, chunk_y in chunk_positions:
+                if all(max(abs(chunk_x - focus_x), abs(chunk_y - focus_y)) >
+                       radius + 1 for focus_x, focus_y in focus_positions):
+                    if (chunk_x, chunk_y) in self._chunks:
+                        self.evict_chunk((chunk_x, chunk_y))
+                    else:
+                        del self._ready_chunks[chunk_x, chunk_y]
+
+    def close(self):
+        if self._worker_pool is not None:
+            self._worker_pool.close()
+
+    def activate_chunk(self, chunk_position):
+        chunk = self._take_chunk(chunk_position)
+        self._chunks[chunk_position] = chunk
+
+        chunk_x, chunk_y = chunk_position
+        size = chunk.chunk_size
+        for x, y in zip(*numpy.nonzero(chunk.health)):
+            grid_position = chunk_x * size + int(x), chunk_y * size + int(y)
+            color = tuple(int(c) for c in chunk.colors[x, y])
+            entity = self._block_entity_creator.create(
+                grid_position, color=color, health=float(chunk.health[x, y]))
+            self._entity_manager.add_entity(entity)
+            chunk.block_entities[grid_position] = entity
+        return chunk
+
+    def evict_chunk(self, chunk_position):
+        chunk = self._chunks.pop(chunk_position)
+        self._sync_chunk(chunk)
+        for entity in chunk.block_entities.itervalues():
+            if entity.alive:
+                self._entity_manager.destroy_entity(entity)
+        chunk.block_entities.clear()
+
+        # Chunks that are still as generated are cheaper to generate again
+        # than to keep.
+        if chunk.modified:
+            self._stored_chunks[chunk_position] = serialize_chunk(chunk)
+        return chunk
+
+    def iter_modified_chunks(self):
+        for chunk in self._chunks.itervalues():
+            self._sync_chunk(chunk)
+            if chunk.modified:
+                yield chunk
+        for chunk_position, serialized_chunk in \
+                self._stored_chunks.iteritems():
+            yield deserialize_chunk(chunk_position, serialized_chunk)
+        if self._saved_terrain is not None:
+            for chunk_position in self._saved_terrain.chunk_positions:
+                if chunk_position not in self._chunks and \
+                        chunk_position not in self._stored_chunks:
+                    yield self._saved_terrain.get_chunk(chunk_position)
+
+    def _sync_chunk(self, chunk):
+        # Copy the block state back from the live entities. Blocks that
+        # have been destroyed are gone for good.
+        chunk_x, chunk_y = chunk.chunk_position
+        size = chunk.chunk_size
+        for (grid_x, grid_y), entity in chunk.block_entities.iteritems():
+            x = grid_x - chunk_x * size
+            y = grid_y - chunk_y * size
+            if entity.alive:
+                health = entity.find_component(HealthComponent).health
+                color = entity.find_component(ColorComponent).color
+            else:
+                health = 0.0
+                color = 0, 0, 0, 0
+            if health != chunk.health[x, y] or \
+                    tuple(chunk.colors[x, y]) != tuple(color):
+                chunk.health[x, y] = health
+                chunk.colors[x, y] = color
+                chunk.modified = True
+
+    def _take_chunk(self, chunk_position):
+        serialized_chunk = self._stored_chunks.pop(chunk_position, None)
+        if serialized_chunk is not None:
+            return deserialize_chunk(chunk_position, serialized_chunk)
+        if self._saved_terrain is not None and \
+                chunk_position in self._saved_terrain:
+            return self._saved_terrain.get_chunk(chunk_position)
+        chunk = self._ready_chunks.pop(chunk_position, None)
+        if chunk is not None:
+            return chunk
+        result = self._pending_chunks.pop(chunk_position, None)
+        if result is not None:
+            return result.get()
+        return self._generator.generate_chunk(chunk_position)
+
+    def _clear_active_bounds(self):
+        # Without anything to stream around, all of space is active.
+        self._active_bounds.p1.assign(float('-inf'), float('-inf'))
+        self._active_bounds.p2.assign(float('inf'), float('inf'))
+
+    def _update_active_bounds(self, focus_positions, radius):
+        chunk_span = self._tile_size * float(self._generator.chunk_size)
+        focus_xs, focus_ys = zip(*focus_positions)
+        self._active_bounds.p1.assign(chunk_span * (min(focus_xs) - radius),
+                                      chunk_span * (min(focus_ys) - radius))
+        self._active_bounds.p2.assign(
+            chunk_span * (max(focus_xs) + radius + 1),
+            chunk_span * (max(focus_ys) + radius + 1))
+
+    def _request_chunks(self, focus_positions, radius):
+        for focus_x, focus_y in focus_positions:
+            for chunk_x in xrange(focus_x - radius, focus_x + radius + 1):
+                for chunk_y in xrange(focus_y - radius, focus_y + radius + 1):
+                    chunk_position = chunk_x, chunk_y
+                    if chunk_position not in self._chunks and \
+                            chunk_position not in self._stored_chunks and \
+                            chunk_position not in self._ready_chunks and \
+                            (self._saved_terrain is None or
+                             chunk_position not in self._saved_terrain) and \
+                            chunk_position not in self._pending_chunks:
+                        self._pending_chunks[chunk_position] = \
+                            self._worker_pool.request_chunk(chunk_position)
+
+    def _collect_chunks(self):
+        for chunk_position, result in self._pending_chunks.items():
+            if result.ready():
+                del self._pending_chunks[chunk_position]
+                self._ready_chunks[chunk_position] = result.get()
@@ -2,20 +2,28 @@ from drillion.component import Component
 from drillion.maths import Transform2
 
 class TransformComponent(Component):
-    def __init__(self, transform=Transform2(), parent=None):
+    def __init__(self, transform=Transform2(), parent=None, hierarchy=None):
         super(TransformComponent, self).__init__()
         self._transform = Transform2(*transform)
         self._parent = parent
         self._children = []
+        if hierarchy is None and parent is not None:
+            hierarchy = parent._hierarchy
+        self._hierarchy = hierarchy
+        self._world_transform = Transform2()
+        self._world_transform_dirty = False
+        self._invalidate()
 
     def create(self):
         if self._parent is not None:
             self._parent._children.append(self)
+            self._invalidate()
 
     def delete(self):
         while self._children:
             child = self._children.pop()
             child._parent = None
+            child._invalidate()
         if self._parent is not None:
             self._parent._children.remove(self)
 
@@ -26,12 +34,26 @@ class TransformComponent(Component):
     @transform.setter
     def transform(self, transform):
         self._transform.assign(*transform)
+        self._invalidate()
 
     @property
     def world_transform(self):
-        transform = Transform2(*self._transform)
-        component = self._parent
-        while component is not None:
-            transform.right_multiply(*component._transform)
-            component = component._parent
-        return transform
+        if self._world_transform_dirty:
+            self._update_world_transform()
+        return self._world_transform
+
+    def _invalidate(self):
+        # A dirty component always has dirty descendants, so the cascade can
+        # stop at components that are already dirty.
+        if not self._world_transform_dirty:
+            self._world_transform_dirty = True
+            if self._hierarchy is not None:
+                self._hierarchy._dirty_components.append(self)
+            for child in self._children:
+                child._invalidate()
+
+    def _update_world_transform(self):
+        self._world_transform.assign(*self._transform)
+        if self._parent is not None:
+            self._world_transform.right_multiply(*self._parent.world_transform)
+        self._world_transform_dirty = False
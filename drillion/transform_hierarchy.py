@@ -0,0 +1,12 @@
+class TransformHierarchy(object):
+    def __init__(self):
+        self._dirty_components = []
+
+    def update(self, dt):
+        # Reading a world transform brings its parent up to date first, so
+        # each dirty transform is computed once, after its ancestors.
+        dirty_components = self._dirty_components
+        self._dirty_components = []
+        for component in dirty_components:
+            if component._world_transform_dirty:
+                component._update_world_transform()
@@ -1,9 +1,12 @@
+from drillion.handler_registry import HandlerRegistry
+
 import time
 
 class UpdatePhase(object):
-    def __init__(self, name):
+    def __init__(self, name, profiler=None):
         self._name = name
-        self._handlers = []
+        self.profiler = profiler
+        self._handlers = HandlerRegistry()
         self._total_time = 0.0
 
     @property
@@ -15,14 +18,36 @@ class UpdatePhase(object):
         return self._total_time
 
     def add_handler(self, handler):
-        self._handlers.append(handler)
+        self._handlers.add(handler)
 
     def remove_handler(self, handler):
         self._handlers.remove(handler)
 
+    def begin_batch(self):
+        self._handlers.begin_batch()
+
+    def end_batch(self):
+        self._handlers.end_batch()
+
+    def find_dead_handlers(self):
+        return self._handlers.find_dead_handlers()
+
     def update(self, dt):
         start_time = time.clock()
-        for handler in self._handlers:
-            handler.update(dt)
+        profiler = self.profiler
+        if profiler is not None and profiler.enabled:
+            self._profile_update(profiler, dt)
+        else:
+            for handler in self._handlers:
+                handler.update(dt)
         end_time = time.clock()
         self._total_time += end_time - start_time
+
+    def _profile_update(self, profiler, dt):
+        clock = profiler.clock
+        phase = profiler.begin_phase(self._name)
+        for handler in self._handlers:
+            handler_start_time = clock()
+            handler.update(dt)
+            phase.add_handler_time(type(handler), clock() - handler_start_time)
+        profiler.end_phase()
@@ -0,0 +1,173 @@
+from drillion.animation_component import AnimationComponent
+from drillion.block_entity_creator import BlockEntityCreator
+from drillion.block_bullet_collision_handler import BlockBulletCollisionHandler
+from drillion.block_ship_collision_handler import BlockShipCollisionHandler
+from drillion.bullet_entity_creator import BulletEntityCreator
+from drillion.bullet_pool import BulletPool
+from drillion.cannon_entity_creator import CannonEntityCreator
+from drillion.collision import CollisionDetector, CollisionFilter
+from drillion.collision_dispatcher import CollisionDispatcher
+from drillion.component_store import ComponentUpdater
+from drillion.draw_phase import DrawPhase
+from drillion.entity_manager import EntityManager
+from drillion.lifetime_system import LifetimeSystem
+from drillion.physics_system import PhysicsSystem
+from drillion.ship_entity_creator import ShipEntityCreator
+from drillion.ship_keys import PLAYER_1_SHIP_KEYS
+from drillion.sprite import SpriteBatch
+from drillion.terrain import (TerrainGenerator, TerrainSystem,
+                              TerrainWorkerPool)
+from drillion.transform_hierarchy import TransformHierarchy
+from drillion.update_phase import UpdatePhase
+
+import random
+
+class World(object):
+    def __init__(self, batch=None, key_state_handler=None, profiler=None,
+                 world_bounds=None,
+                 bullet_capacity=256, chunk_size=8, active_radius=2,
+                 terrain_processes=0, install_budget=None, terrain_seed=None):
+        self.input_update_phase = UpdatePhase('input', profiler)
+        self.control_update_phase = UpdatePhase('control', profiler)
+        self.physics_update_phase = UpdatePhase('physics', profiler)
+        self.transform_update_phase = UpdatePhase('transform', profiler)
+        self.collision_transform_update_phase = \
+            UpdatePhase('collision_transform', profiler)
+        self.collision_update_phase = UpdatePhase('collision', profiler)
+        self.health_update_phase = UpdatePhase('health', profiler)
+        self.lifetime_update_phase = UpdatePhase('lifetime', profiler)
+        self.terrain_update_phase = UpdatePhase('terrain', profiler)
+        self.destroy_update_phase = UpdatePhase('destroy', profiler)
+        self.animation_update_phase = UpdatePhase('animation', profiler)
+        self.draw_phase = DrawPhase('draw', profiler)
+        self.sprite_draw_phase = DrawPhase('sprites', profiler)
+
+        self.update_phases = [
+            self.input_update_phase,
+            self.control_update_phase,
+            self.physics_update_phase,
+            self.transform_update_phase,
+            self.collision_transform_update_phase,
+            self.collision_update_phase,
+            self.health_update_phase,
+            self.lifetime_update_phase,
+            self.terrain_update_phase,
+            self.destroy_update_phase,
+            self.animation_update_phase,
+        ]
+        self.draw_phases = [self.draw_phase, self.sprite_draw_phase]
+
+        self.sprite_batch = SpriteBatch(batch=batch)
+        self.sprite_draw_phase.add_handler(self.sprite_batch)
+        self.static_sprite_batch = SpriteBatch(batch=batch, static=True)
+        self.sprite_draw_phase.add_handler(self.static_sprite_batch)
+
+        self.entity_manager = EntityManager()
+        self.destroy_update_phase.add_handler(self.entity_manager)
+        self.animation_updater = \
+            ComponentUpdater(self.entity_manager.component_store,
+                             AnimationComponent)
+        self.animation_update_phase.add_handler(self.animation_updater)
+
+        self.physics_system = PhysicsSystem()
+        self.physics_update_phase.add_handler(self.physics_system)
+
+        self.transform_hierarchy = TransformHierarchy()
+        self.transform_update_phase.add_handler(self.transform_hierarchy)
+
+        self.lifetime_system = LifetimeSystem(self.entity_manager,
+                                              world_bounds)
+        self.lifetime_update_phase.add_handler(self.lifetime_system)
+
+        self.block_bullet_collision_handler = \
+            BlockBulletCollisionHandler(self.entity_manager)
+        self.block_ship_collision_handler = \
+            BlockShipCollisionHandler(self.entity_manager)
+        collision_handlers = {
+            ('block', 'bullet'): self.block_bullet_collision_handler,
+            ('block', 'ship'): self.block_ship_collision_handler,
+        }
+        collision_dispatcher = CollisionDispatcher(collision_handlers)
+        collision_filter = CollisionFilter(collision_handlers.keys())
+
+        self.collision_detector = \
+            CollisionDetector(listener=collision_dispatcher,
+                              collision_filter=collision_filter)
+        self.collision_update_phase.add_handler(self.collision_detector)
+
+        for phase in self.update_phases + self.draw_phases:
+            self.entity_manager.add_batch_handler(phase)
+        self.entity_manager.add_batch_handler(self.collision_detector)
+
+        self.block_entity_creator = \
+            BlockEntityCreator(self.health_update_phase,
+                               self.collision_detector,
+                               self.static_sprite_batch)
+        self.bullet_entity_creator = \
+            BulletEntityCreator(self.physics_system, self.transform_hierarchy,
+                                self.collision_transform_update_phase,
+                                self.draw_phase, self.lifetime_system,
+                                self.collision_detector, self.sprite_batch)
+        self.bullet_pool = BulletPool(self.bullet_entity_creator,
+                                      self.entity_manager, bullet_capacity)
+        self.block_bullet_collision_handler.bullet_pool = self.bullet_pool
+        self.ship_entity_creator = \
+            ShipEntityCreator(self.input_update_phase,
+                              self.control_update_phase, self.physics_system,
+                              self.transform_hierarchy,
+                              self.collision_transform_update_phase,
+                              self.draw_phase, key_state_handler,
+                              self.collision_detector, self.sprite_batch,
+                              self.bullet_pool)
+        self.cannon_entity_creator = \
+            CannonEntityCreator(self.draw_phase, self.sprite_batch)
+
+        if terrain_seed is None:
+            terrain_seed = random.randrange(1 << 30)
+        terrain_generator = TerrainGenerator(chunk_size, terrain_seed)
+        terrain_worker_pool = None
+        if terrain_processes:
+            terrain_worker_pool = TerrainWorkerPool(terrain_generator,
+                                                    terrain_processes)
+        self.terrain_system = TerrainSystem(self.entity_manager,
+                                            self.block_entity_creator,
+                                            terrain_generator,
+                                            active_radius=active_radius,
+                                            worker_pool=terrain_worker_pool,
+                                            install_budget=install_budget)
+        self.terrain_update_phase.add_handler(self.terrain_system)
+        if world_bounds is None:
+            # Cull bullets that leave the terrain streamed in around the
+            # ships.
+            self.lifetime_system.world_bounds = \
+                self.terrain_system.active_bounds
+
+        self.ships = []
+
+    def update(self, dt):
+        for phase in self.update_phases:
+            phase.update(dt)
+
+    def close(self):
+        self.terrain_system.close()
+
+    def generate_terrain(self, grid_size=40):
+        grid_min = -grid_size // 2
+        grid_max = grid_size // 2
+        self.terrain_system.load_area(grid_min, grid_min, grid_max, grid_max)
+
+    def create_ship(self, position=(0.0, 0.0), angle=0.0,
+                    keys=PLAYER_1_SHIP_KEYS, cannons=[]):
+        ship_entity = self.ship_entity_creator.create(position=position,
+                                                      angle=angle, keys=keys)
+        self.entity_manager.add_entity(ship_entity)
+        self.terrain_system.add_focus(ship_entity)
+        self.ships.append(ship_entity)
+        for cannon_position, cannon_angle, length, width in cannons:
+            cannon_entity = \
+                self.cannon_entity_creator.create(ship_entity,
+                                                  position=cannon_position,
+                                                  angle=cannon_angle,
+                                                  length=length, width=width)
+            self.entity_manager.add_entity(cannon_entity)
+        return ship_entity
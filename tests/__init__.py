@@ -0,0 +1,4 @@
+import pyglet
+
+# The tests run without a display.
+pyglet.options['shadow_window'] = False
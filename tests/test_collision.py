@@ -0,0 +1,210 @@
+from drillion.collision import (CollisionBody, CollisionBodyArrays,
+                                CollisionDetector, CollisionGrid,
+                                CollisionListener, CollisionTile,
+                                SweepAndPrune)
+from drillion.maths import Box2, Transform2
+
+import random
+import unittest
+
+def create_bodies(rng, count, static=False):
+    bodies = []
+    for index in xrange(count):
+        width = rng.choice([0.5, 1.0, 2.0, 8.0])
+        height = rng.uniform(0.5, 2.0)
+        vertices = [(0.0, 0.0), (width, 0.0), (width, height), (0.0, height)]
+        transform = Transform2(c=rng.uniform(-20.0, 20.0),
+                               f=rng.uniform(-20.0, 20.0))
+        bodies.append(CollisionBody(vertices, transform,
+                                    user_data=('body', index + 1000 * static),
+                                    static=static))
+    return bodies
+
+class RecordingListener(CollisionListener):
+    def __init__(self):
+        self.events = []
+
+    def on_collision_add(self, collision):
+        self.events.append(('add', collision.body_a.user_data,
+                            collision.body_b.user_data))
+
+    def on_collision_remove(self, collision):
+        self.events.append(('remove', collision.body_a.user_data,
+                            collision.body_b.user_data))
+
+def get_collision_keys(detector):
+    return sorted((collision.body_a.user_data, collision.body_b.user_data)
+                  for collision in detector.collisions)
+
+class SweepAndPruneTest(unittest.TestCase):
+    def test_query_box_matches_brute_force(self):
+        rng = random.Random(1)
+        broadphase = SweepAndPrune()
+        detector = CollisionDetector(broadphase=broadphase)
+        bodies = create_bodies(rng, 200)
+        for body in bodies:
+            detector.add_body(body)
+        detector.update(0.0)
+        for _ in xrange(200):
+            x = rng.uniform(-25.0, 25.0)
+            y = rng.uniform(-25.0, 25.0)
+            bounds = Box2((x, y), (x + rng.uniform(0.0, 6.0),
+                                   y + rng.uniform(0.0, 6.0)))
+            expected = set(body for body in bodies
+                           if bounds.intersects(body._world_bounds))
+            self.assertEqual(set(broadphase.query_box(bounds)), expected)
+
+    def test_matches_grid_with_static_bodies(self):
+        detectors = []
+        for broadphase_factory in (lambda: CollisionGrid(2.0),
+                                   SweepAndPrune):
+            rng = random.Random(2)
+            detector = CollisionDetector(
+                broadphase=broadphase_factory(),
+                static_broadphase=broadphase_factory())
+            dynamic_bodies = create_bodies(rng, 60)
+            for body in dynamic_bodies + create_bodies(rng, 60, static=True):
+                detector.add_body(body)
+            detectors.append((detector, dynamic_bodies, rng))
+
+        for _ in xrange(20):
+            collision_keys = []
+            for detector, dynamic_bodies, rng in detectors:
+                for body in dynamic_bodies:
+                    body.transform.c += rng.uniform(-1.0, 1.0)
+                    body.transform.f += rng.uniform(-1.0, 1.0)
+                    body.touch()
+                detector.update(0.1)
+                collision_keys.append(get_collision_keys(detector))
+            self.assertTrue(collision_keys[0])
+            self.assertEqual(collision_keys[0], collision_keys[1])
+
+class CollisionDetectorQueryTest(unittest.TestCase):
+    def test_nested_queries(self):
+        detector = CollisionDetector()
+        for x in xrange(-3, 3):
+            body = CollisionBody([(-1.0, -1.0), (1.0, -1.0), (1.0, 1.0),
+                                  (-1.0, 1.0)], Transform2(c=0.1 * x),
+                                 user_data=('rock', x))
+            detector.add_body(body)
+        detector.add_tile(CollisionTile((5, 5), user_data=('block', None)))
+        detector.update(0.0)
+
+        expected = list(detector.query_point(0.0, 0.0))
+        self.assertEqual(len(expected), 6)
+        bodies = []
+        for body in detector.query_point(0.0, 0.0):
+            bodies.append(body)
+            detector.nearest('block', 20.0, 20.0)
+            detector.ray_cast(-50.0, -50.0, -40.0, -40.0)
+            list(detector.query_point(30.0, 30.0))
+        self.assertEqual(bodies, expected)
+
+class CollisionEventTest(unittest.TestCase):
+    def check_event_sequence(self, arrays):
+        listener = RecordingListener()
+        detector = CollisionDetector(listener=listener, arrays=arrays)
+        vertices = [(-1.0, -1.0), (1.0, -1.0), (1.0, 1.0), (-1.0, 1.0)]
+        rock = CollisionBody(vertices, user_data=('rock', None))
+        ship = CollisionBody(vertices, Transform2(c=-5.0),
+                             user_data=('ship', None))
+        detector.add_body(rock)
+        detector.add_body(ship)
+        detector.update(0.0)
+
+        events = []
+        collisions = []
+        for x in [-3.0, -1.5, 0.0, 1.5, 3.0, 5.0, 0.5, 0.0]:
+            ship.transform.c = x
+            ship.touch()
+            detector.update(0.0)
+            events.append(listener.events)
+            listener.events = []
+            collisions.append(list(detector.collisions))
+        added = 'add', ('rock', None), ('ship', None)
+        removed = 'remove', ('rock', None), ('ship', None)
+        self.assertEqual(events, [[], [added], [], [], [removed], [],
+                                  [added], []])
+
+        # A continuing contact keeps its collision object.
+        self.assertEqual(len(collisions[1]), 1)
+        self.assertTrue(collisions[1][0] is collisions[2][0] is
+                        collisions[3][0])
+        self.assertTrue(collisions[6][0] is not collisions[1][0])
+
+        # Removing a body ends its contacts, and an idle update reports
+        # nothing.
+        detector.remove_body(rock)
+        self.assertEqual(listener.events, [removed])
+        detector.update(0.0)
+        self.assertEqual(listener.events, [removed])
+        self.assertEqual(list(detector.collisions), [])
+
+    def test_event_sequence(self):
+        for arrays in None, CollisionBodyArrays():
+            self.check_event_sequence(arrays)
+
+class SweptBodyTest(unittest.TestCase):
+    def check_first_hit(self, arrays, start, end, expected_hit):
+        listener = RecordingListener()
+        detector = CollisionDetector(listener=listener, arrays=arrays)
+        for grid_position in [(0, 0), (1, 0), (2, 0), (1, 1)]:
+            detector.add_tile(CollisionTile(grid_position,
+                                            user_data=('block',
+                                                       grid_position)))
+        ship = CollisionBody([(-0.5, -0.5), (0.5, -0.5), (0.5, 0.5),
+                              (-0.5, 0.5)], Transform2(c=-3.0, f=1.0),
+                             user_data=('ship', None))
+        detector.add_body(ship)
+        bullet = CollisionBody([(0.0, 0.0)], Transform2(c=start[0],
+                                                        f=start[1]),
+                               user_data=('bullet', None))
+        detector.add_body(bullet)
+        detector.update(0.0)
+        self.assertEqual(listener.events, [])
+
+        bullet.transform.c, bullet.transform.f = end
+        bullet.touch()
+        detector.update(0.0)
+        self.assertEqual(listener.events, [('add',) + expected_hit])
+
+    def test_first_hit(self):
+        for arrays in None, CollisionBodyArrays():
+            # Moving left, right and down across several tiles, and into a
+            # body before reaching the tiles behind it.
+            self.check_first_hit(arrays, (7.5, 1.0), (0.5, 1.0),
+                                 (('block', (2, 0)), ('bullet', None)))
+            self.check_first_hit(arrays, (-5.0, 1.0), (5.5, 1.0),
+                                 (('bullet', None), ('ship', None)))
+            self.check_first_hit(arrays, (-2.0, 1.0), (5.5, 1.0),
+                                 (('block', (0, 0)), ('bullet', None)))
+            self.check_first_hit(arrays, (3.0, 5.5), (3.0, 0.5),
+                                 (('block', (1, 1)), ('bullet', None)))
+
+class CollisionDetectorKeyTest(unittest.TestCase):
+    def test_tiles_do_not_use_body_keys(self):
+        arrays = CollisionBodyArrays(capacity=4)
+        detector = CollisionDetector(arrays=arrays)
+        for grid_x in xrange(100):
+            for grid_y in xrange(10):
+                detector.add_tile(CollisionTile((grid_x, grid_y),
+                                                user_data=('block', None)))
+        bodies = [CollisionBody([(-0.5, -0.5), (0.5, -0.5), (0.5, 0.5),
+                                 (-0.5, 0.5)], Transform2(c=1.0, f=1.0),
+                                user_data=('rock', index))
+                  for index in xrange(2)]
+        for body in bodies:
+            detector.add_body(body)
+        self.assertEqual([body.key for body in bodies], [0, 1])
+        self.assertEqual(arrays.capacity, 4)
+
+        # Both bodies touch the tile with key 0, so the pairs of keys are
+        # the same for body-body and body-tile collisions.
+        detector.update(0.0)
+        self.assertEqual(get_collision_keys(detector),
+                         [(('block', None), ('rock', 0)),
+                          (('block', None), ('rock', 1)),
+                          (('rock', 0), ('rock', 1))])
+
+if __name__ == '__main__':
+    unittest.main()
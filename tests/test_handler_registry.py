@@ -0,0 +1,47 @@
+from drillion.component import Component
+from drillion.entity import Entity
+from drillion.entity_manager import EntityManager
+from drillion.update_phase import UpdatePhase
+
+import unittest
+
+class LeakyComponent(Component):
+    def __init__(self, update_phase):
+        super(LeakyComponent, self).__init__()
+        self.update_phase = update_phase
+
+    def create(self):
+        self.update_phase.add_handler(self)
+
+    def update(self, dt):
+        pass
+
+class TidyComponent(LeakyComponent):
+    def delete(self):
+        self.update_phase.remove_handler(self)
+
+class HandlerRegistryTest(unittest.TestCase):
+    def test_find_dead_handlers(self):
+        update_phase = UpdatePhase('update')
+        entity_manager = EntityManager()
+        leaky_component = LeakyComponent(update_phase)
+        tidy_component = TidyComponent(update_phase)
+        entities = [Entity([leaky_component]), Entity([tidy_component]),
+                    Entity([LeakyComponent(update_phase)])]
+        for entity in entities:
+            entity_manager.add_entity(entity)
+        self.assertEqual(update_phase.find_dead_handlers(), [])
+
+        entity_manager.destroy_entity(entities[0])
+        entity_manager.destroy_entity(entities[1])
+        entity_manager.flush()
+        self.assertEqual(update_phase.find_dead_handlers(), [leaky_component])
+
+    def test_add_twice(self):
+        update_phase = UpdatePhase('update')
+        component = LeakyComponent(update_phase)
+        update_phase.add_handler(component)
+        self.assertRaises(ValueError, update_phase.add_handler, component)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+from drillion.maths import (convex_polygons_contain_points,
+                            intersect_convex_polygons, Polygon2, Transform2)
+
+import math
+import random
+import unittest
+
+MAX_VERTEX_COUNT = 4
+
+def create_polygon(rng):
+    vertex_count = rng.choice([1, 2, 3, 4])
+    if vertex_count == 4:
+        vertices = [(-1.0, -1.0), (1.0, -1.0), (1.0, 1.0), (-1.0, 1.0)]
+    else:
+        vertices = [(rng.uniform(-1.0, 1.0), rng.uniform(-1.0, 1.0))
+                    for _ in xrange(vertex_count)]
+        if vertex_count == 3:
+            (x1, y1), (x2, y2), (x3, y3) = vertices
+            if (x2 - x1) * (y3 - y1) - (y2 - y1) * (x3 - x1) < 0.0:
+                vertices.reverse()
+
+    # Snap some of the polygons to a coarse grid, so that edges and
+    # vertices often touch exactly.
+    transform = Transform2()
+    transform.scale(rng.uniform(0.5, 2.0), rng.uniform(0.5, 2.0))
+    if rng.random() < 0.5:
+        transform.rotate(rng.uniform(0.0, 2.0 * math.pi))
+        transform.translate(rng.uniform(-2.0, 2.0), rng.uniform(-2.0, 2.0))
+        return [transform.transform_point(x, y) for x, y in vertices]
+    transform.translate(rng.randint(-2, 2), rng.randint(-2, 2))
+    return [tuple(round(2.0 * value) / 2.0
+                  for value in transform.transform_point(x, y))
+            for x, y in vertices]
+
+def pad_polygons(polygons):
+    # Pad each row with its first vertex, like the collision detector does.
+    return ([polygon + polygon[:1] * (MAX_VERTEX_COUNT - len(polygon))
+             for polygon in polygons],
+            [len(polygon) for polygon in polygons])
+
+class ConvexPolygonBatchTest(unittest.TestCase):
+    def test_intersect_convex_polygons(self):
+        rng = random.Random(1)
+        polygons_a = [create_polygon(rng) for _ in xrange(2000)]
+        polygons_b = [create_polygon(rng) for _ in xrange(2000)]
+        vertices_a, counts_a = pad_polygons(polygons_a)
+        vertices_b, counts_b = pad_polygons(polygons_b)
+        result = intersect_convex_polygons(vertices_a, counts_a,
+                                           vertices_b, counts_b)
+        expected = [Polygon2(polygon_a).intersects(Polygon2(polygon_b))
+                    for polygon_a, polygon_b in zip(polygons_a, polygons_b)]
+        self.assertEqual(result.tolist(), expected)
+        self.assertTrue(0 < sum(expected) < len(expected))
+
+    def test_convex_polygons_contain_points(self):
+        rng = random.Random(2)
+        polygons = [create_polygon(rng) for _ in xrange(2000)]
+        points = [create_polygon(rng)[0] for _ in xrange(2000)]
+        vertices, counts = pad_polygons(polygons)
+        result = convex_polygons_contain_points(vertices, counts, points)
+        expected = [Polygon2(polygon).contains_point(x, y)
+                    for polygon, (x, y) in zip(polygons, points)]
+        self.assertEqual(result.tolist(), expected)
+        self.assertTrue(0 < sum(expected) < len(expected))
+
+if __name__ == '__main__':
+    unittest.main()
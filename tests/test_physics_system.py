@@ -0,0 +1,76 @@
+from drillion.maths import Transform2
+from drillion.physics_component import PhysicsComponent
+from drillion.physics_system import PHYSICS_ATTRIBUTES, PhysicsSystem
+from drillion.transform_component import TransformComponent
+
+import random
+import unittest
+
+def create_component_options(rng):
+    # Mix resting and moving bodies, slow and fast ones, and friction that
+    # is stronger than the speed it acts on.
+    return dict(
+        position=(rng.uniform(-10.0, 10.0), rng.uniform(-10.0, 10.0)),
+        velocity=rng.choice([(0.0, 0.0),
+                             (rng.uniform(-20.0, 20.0),
+                              rng.uniform(-20.0, 20.0))]),
+        acceleration=(rng.uniform(-5.0, 5.0), rng.uniform(-5.0, 5.0)),
+        max_velocity=rng.uniform(1.0, 10.0),
+        friction=rng.choice([0.0, rng.uniform(0.0, 50.0)]),
+        angle=rng.uniform(-3.0, 3.0),
+        angular_velocity=rng.uniform(-10.0, 10.0),
+        angular_acceleration=rng.uniform(-5.0, 5.0),
+        max_angular_velocity=rng.uniform(0.5, 5.0),
+        angular_friction=rng.choice([0.0, rng.uniform(0.0, 20.0)]))
+
+class PhysicsSystemTest(unittest.TestCase):
+    def assert_components_equal(self, component, expected_component):
+        for name, size in PHYSICS_ATTRIBUTES:
+            value = getattr(component, name)
+            expected_value = getattr(expected_component, name)
+            if size == 1:
+                value = value,
+                expected_value = expected_value,
+            for value, expected_value in zip(value, expected_value):
+                self.assertAlmostEqual(value, expected_value, places=9)
+        for value, expected_value in \
+                zip(component.transform_component.transform,
+                    expected_component.transform_component.transform):
+            self.assertAlmostEqual(value, expected_value, places=9)
+
+    def test_update_matches_component_update(self):
+        rng = random.Random(1)
+        physics_system = PhysicsSystem(capacity=4)
+        components = []
+        expected_components = []
+        for _ in xrange(100):
+            options = create_component_options(rng)
+            component = PhysicsComponent(TransformComponent(Transform2()),
+                                         physics_system, **options)
+            physics_system.add_handler(component)
+            components.append(component)
+            expected_components.append(
+                PhysicsComponent(TransformComponent(Transform2()), None,
+                                 **options))
+
+        for step in xrange(60):
+            dt = rng.uniform(0.01, 0.1)
+            if step == 30:
+                # Changes made through the components must reach the arrays.
+                for component in components[::7] + expected_components[::7]:
+                    component.velocity = 50.0, -50.0
+                    component.friction = 0.0
+                for component in components[::2]:
+                    physics_system.remove_handler(component)
+            physics_system.update(dt)
+            if step >= 30:
+                for component in components[::2]:
+                    component.update(dt)
+            for expected_component in expected_components:
+                expected_component.update(dt)
+            for component, expected_component in zip(components,
+                                                     expected_components):
+                self.assert_components_equal(component, expected_component)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+from drillion.pnoise import fbm, fbm_grid, pnoise, pnoise_grid
+
+import random
+import unittest
+
+class NoiseGridTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(1)
+        self.xs = ([-300.5, -1.0, -0.75, 0.0, 0.3, 1.0, 255.5, 256.25] +
+                   [rng.uniform(-20.0, 20.0) for _ in xrange(8)])
+        self.ys = ([-257.0, -2.5, -0.1, 0.0, 0.5, 2.0, 511.75] +
+                   [rng.uniform(-20.0, 20.0) for _ in xrange(8)])
+        self.zs = [-3.25, 0.0, 0.7, 12.0]
+
+    def test_pnoise_grid(self):
+        for z in self.zs:
+            grid = pnoise_grid(self.xs, self.ys, z)
+            self.assertEqual(grid.shape, (len(self.xs), len(self.ys)))
+            self.assertEqual(grid.tolist(),
+                             [[pnoise(x, y, z) for y in self.ys]
+                              for x in self.xs])
+
+    def test_fbm_grid(self):
+        for z in self.zs:
+            grid = fbm_grid(self.xs, self.ys, z, octaves=3, lacunarity=1.7,
+                            gain=0.6)
+            self.assertEqual(grid.tolist(),
+                             [[fbm(x, y, z, octaves=3, lacunarity=1.7,
+                                   gain=0.6) for y in self.ys]
+                              for x in self.xs])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+from drillion.health_component import HealthComponent
+from drillion.lifetime_component import LifetimeComponent
+from drillion.physics_component import PhysicsComponent
+from drillion.physics_system import PHYSICS_ATTRIBUTES
+from drillion.save_game import save_world, SaveFile
+from drillion.world import World
+
+from pyglet.window.key import KeyStateHandler
+
+import os
+import shutil
+import tempfile
+import unittest
+
+def create_world():
+    world = World(key_state_handler=KeyStateHandler(), active_radius=1,
+                  terrain_seed=5)
+    world.create_ship(position=(1.0, 1.0))
+    return world
+
+def get_block_health(world):
+    return dict((grid_position,
+                 entity.find_component(HealthComponent).health)
+                for chunk in world.terrain_system.chunks.itervalues()
+                for grid_position, entity in
+                chunk.block_entities.iteritems() if entity.alive)
+
+class SaveGameTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_round_trip(self):
+        world = create_world()
+        world.update(0.1)
+        chunk_positions = sorted(world.terrain_system.chunks)
+        for chunk_position, health in zip(chunk_positions,
+                                          [0.1000000000000001,
+                                           0.6000000000000001]):
+            chunk = world.terrain_system.chunks[chunk_position]
+            for entity in chunk.block_entities.itervalues():
+                entity.find_component(HealthComponent).health = health
+        expected_block_health = get_block_health(world)
+
+        # Evicted chunks are kept serialized until they are saved.
+        world.terrain_system.evict_chunk(chunk_positions[1])
+
+        physics_component = world.ships[0].find_component(PhysicsComponent)
+        physics_component.velocity = 1.0 / 3.0, -0.3
+        physics_component.angle = 0.1
+        world.bullet_pool.spawn(position=(1.5, 2.5), velocity=(0.1, 0.2),
+                                color=(1, 2, 3, 4), lifetime=0.7)
+        expected_physics = [getattr(physics_component, name)
+                            for name, size in PHYSICS_ATTRIBUTES]
+        path = os.path.join(self.temp_dir, 'save.bin')
+        save_world(world, path)
+        world.close()
+
+        world = create_world()
+        save_file = SaveFile(path)
+        save_file.restore(world)
+        physics_component = world.ships[0].find_component(PhysicsComponent)
+        self.assertEqual([getattr(physics_component, name)
+                          for name, size in PHYSICS_ATTRIBUTES],
+                         expected_physics)
+        bullet_entities = list(world.bullet_pool.iter_active_entities())
+        self.assertEqual(len(bullet_entities), 1)
+        bullet_entity = bullet_entities[0]
+        self.assertEqual(
+            bullet_entity.find_component(PhysicsComponent).position,
+            (1.5, 2.5))
+        self.assertEqual(
+            bullet_entity.find_component(LifetimeComponent).
+            remaining_lifetime, 0.7)
+
+        world.update(0.0)
+        self.assertEqual(get_block_health(world), expected_block_health)
+        save_file.close()
+        world.close()
+
+if __name__ == '__main__':
+    unittest.main()
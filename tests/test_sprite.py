@@ -0,0 +1,85 @@
+from drillion.maths import Transform2
+from drillion.sprite import BatchPolygonSprite, SpriteBatch
+
+import math
+import numpy
+import random
+import unittest
+
+def create_sprite(rng, sprite_batch):
+    vertex_count = rng.randint(3, 6)
+    vertices = [(math.cos(2.0 * math.pi * i / vertex_count),
+                 math.sin(2.0 * math.pi * i / vertex_count))
+                for i in xrange(vertex_count)]
+    color = tuple(rng.randint(0, 255) for _ in xrange(4))
+    transform = Transform2(c=rng.uniform(-10.0, 10.0),
+                           f=rng.uniform(-10.0, 10.0))
+    return BatchPolygonSprite(vertices, color, transform, sprite_batch)
+
+def get_batch_triangles(sprite_batch):
+    vertex_data = sprite_batch.vertex_data.tolist()
+    color_data = sprite_batch.color_data.tolist()
+    triangles = []
+    for indices in sprite_batch.index_data.reshape(-1, 3).tolist():
+        if indices[0] != indices[1]:
+            triangles.append(tuple((tuple(vertex_data[index]),
+                                    tuple(color_data[index]))
+                                   for index in indices))
+    return sorted(triangles)
+
+def get_sprite_triangles(sprites):
+    triangles = []
+    for sprite in sprites:
+        # Round through a single precision float, like the vertex data.
+        vertices = [tuple(numpy.float32(sprite.transform.transform_point(
+                    x, y)).tolist()) for x, y in sprite.vertices]
+        for i in xrange(1, len(vertices) - 1):
+            triangles.append(tuple((vertices[index], tuple(sprite.color))
+                                   for index in (0, i, i + 1)))
+    return sorted(triangles)
+
+class SpriteBatchTest(unittest.TestCase):
+    def check_buffers(self, sprite_batch, sprites):
+        sprite_batch.update()
+        self.assertEqual(sprite_batch.sprite_count, len(sprites))
+        self.assertEqual(sprite_batch.vertex_count,
+                         sum(len(sprite.vertices) for sprite in sprites))
+        self.assertEqual(get_batch_triangles(sprite_batch),
+                         get_sprite_triangles(sprites))
+
+    def test_buffers(self):
+        rng = random.Random(1)
+        sprite_batch = SpriteBatch(capacity=4)
+        sprites = [create_sprite(rng, sprite_batch) for _ in xrange(20)]
+        self.assertTrue(sprite_batch.capacity >= 20 * 3)
+        self.check_buffers(sprite_batch, sprites)
+
+        for sprite in sprites[::3]:
+            transform = Transform2()
+            transform.rotate(rng.uniform(0.0, 2.0 * math.pi))
+            transform.translate(rng.uniform(-10.0, 10.0),
+                                rng.uniform(-10.0, 10.0))
+            sprite.transform = transform
+            sprite.color = (1, 2, 3, 4)
+        self.check_buffers(sprite_batch, sprites)
+
+        # Leave holes behind, then remove enough sprites to compact.
+        for sprite in sprites[1:5]:
+            sprite.batch = None
+        del sprites[1:5]
+        self.check_buffers(sprite_batch, sprites)
+        self.assertTrue(len(sprite_batch.vertex_data) >
+                        sprite_batch.vertex_count)
+        for sprite in sprites[2:12]:
+            sprite.batch = None
+        del sprites[2:12]
+        self.check_buffers(sprite_batch, sprites)
+        self.assertEqual(len(sprite_batch.vertex_data),
+                         sprite_batch.vertex_count)
+
+        sprites.extend(create_sprite(rng, sprite_batch) for _ in xrange(40))
+        sprites[0].transform = Transform2(c=100.0)
+        self.check_buffers(sprite_batch, sprites)
+
+if __name__ == '__main__':
+    unittest.main()
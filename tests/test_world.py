@@ -0,0 +1,77 @@
+from drillion.animation_component import AnimationComponent
+from drillion.entity import Entity
+from drillion.maths import Transform2
+from drillion.sprite_component import SpriteComponent
+from drillion.transform_component import TransformComponent
+from drillion.world import World
+
+import unittest
+
+class WorldTest(unittest.TestCase):
+    def test_bullets_culled_around_streamed_terrain(self):
+        world = World(active_radius=1, terrain_seed=1)
+        transform_component = TransformComponent(Transform2(c=1000.0,
+                                                            f=1000.0))
+        focus_entity = Entity([transform_component])
+        world.entity_manager.add_entity(focus_entity)
+        world.terrain_system.add_focus(focus_entity)
+        world.update(0.1)
+
+        near_bullet = world.bullet_pool.spawn(position=(1001.0, 1001.0))
+        far_bullet = world.bullet_pool.spawn(position=(1100.0, 1000.0))
+        for _ in xrange(3):
+            world.update(0.1)
+        self.assertTrue(near_bullet.alive)
+        self.assertFalse(far_bullet.alive)
+
+        transform_component.transform = Transform2()
+        for _ in xrange(3):
+            world.update(0.1)
+        self.assertFalse(near_bullet.alive)
+        world.close()
+
+    def test_animation_updated_through_component_store(self):
+        world = World(terrain_seed=1)
+        bullet = world.bullet_pool.spawn(position=(1.0, 2.0),
+                                         velocity=(10.0, 0.0))
+        for _ in xrange(3):
+            world.update(0.1)
+        animation_component = bullet.find_component(AnimationComponent)
+        transform_component = bullet.find_component(TransformComponent)
+        self.assertEqual(tuple(animation_component.transform),
+                         tuple(transform_component.world_transform))
+        self.assertNotEqual(tuple(animation_component.old_transform),
+                            tuple(animation_component.transform))
+        self.assertEqual(
+            world.entity_manager.component_store.count_components(
+                AnimationComponent), 1)
+        world.close()
+
+    def test_bullets_drawn_through_sprite_batch(self):
+        world = World(terrain_seed=1)
+        world.update(0.1)
+        sprite_count = world.sprite_batch.sprite_count
+        bullet = world.bullet_pool.spawn(position=(1.0, 2.0),
+                                         velocity=(10.0, 0.0),
+                                         color=(1, 2, 3, 4))
+        world.update(0.1)
+        for phase in world.draw_phases:
+            phase.draw(1.0)
+        self.assertEqual(world.sprite_batch.sprite_count, sprite_count + 1)
+        sprite = bullet.find_component(SpriteComponent).sprite
+        self.assertEqual(tuple(sprite.transform),
+                         tuple(bullet.find_component(TransformComponent).
+                               world_transform))
+        start = sprite._vertex_start
+        end = start + len(sprite.vertices)
+        self.assertEqual(
+            world.sprite_batch.color_data[start:end].tolist(),
+            [[1, 2, 3, 4]] * len(sprite.vertices))
+
+        world.bullet_pool.despawn(bullet)
+        world.update(0.1)
+        self.assertEqual(world.sprite_batch.sprite_count, sprite_count)
+        world.close()
+
+if __name__ == '__main__':
+    unittest.main()